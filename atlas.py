@@ -0,0 +1,144 @@
+import pygame
+import os
+import hashlib
+from math import ceil, sqrt
+
+
+def getAssetNames(directory):
+    """
+    Returns the sorted names of the png assets in the given directory.
+
+    Parameters
+    ----------
+        directory : str
+            the directory of the assets
+
+    Return
+    ------
+        names : list[str]
+    """
+    return sorted(fileName for fileName in os.listdir(directory) if fileName.endswith(".png"))
+
+
+def getAtlasKey(directory, names, size):
+    """
+    Returns a key identifying the atlas of the given assets scaled to the given size.
+
+    The key changes whenever an asset is added, removed or modified, or the size changes.
+
+    Parameters
+    ----------
+        directory : str
+            the directory of the assets
+        names : list[str]
+            names of the assets
+        size : (int, int)
+            width and height every asset is scaled to
+
+    Return
+    ------
+        key : str
+    """
+    digest = hashlib.sha1("{}x{}".format(size[0], size[1]).encode())
+    for fileName in names:
+        stat = os.stat(os.path.join(directory, fileName))
+        digest.update("{}:{}:{}".format(fileName, stat.st_mtime_ns, stat.st_size).encode())
+    return digest.hexdigest()[:16]
+
+
+def getLayout(count):
+    """
+    Returns the number of columns of an atlas holding the given number of sprites, so it stays square.
+
+    Parameters
+    ----------
+        count : int
+            number of sprites
+
+    Return
+    ------
+        columns : int
+    """
+    return max(1, ceil(sqrt(count)))
+
+
+def buildAtlas(directory, names, size):
+    """
+    Loads the assets, scales them to the given size and packs them into a single surface.
+
+    Parameters
+    ----------
+        directory : str
+            the directory of the assets
+        names : list[str]
+            names of the assets, in the order they are packed
+        size : (int, int)
+            width and height every asset is scaled to
+
+    Return
+    ------
+        atlas : pygame.Surface
+    """
+    columns = getLayout(len(names))
+    rows = ceil(len(names) / columns)
+    atlas = pygame.Surface((columns * size[0], max(1, rows) * size[1]), pygame.SRCALPHA)
+    for i, fileName in enumerate(names):
+        image = pygame.image.load(os.path.join(directory, fileName))
+        image = pygame.transform.scale(image, size)
+        # the atlas starts fully transparent, so the maximum copies the pixels and their alpha unchanged
+        atlas.blit(image, (i % columns * size[0], i // columns * size[1]), special_flags=pygame.BLEND_RGBA_MAX)
+    return atlas
+
+
+def loadAtlas(directory, size, cacheDirectory="cache"):
+    """
+    Returns the assets of the directory scaled to the given size, as subsurfaces of a single atlas.
+
+    The atlas is saved in the cache directory and loaded from there on the next call, as long as the
+    assets and the size stay the same. Older atlases of the same directory and size are removed.
+
+    Parameters
+    ----------
+        directory : str
+            the directory of the assets
+        size : (int, int)
+            width and height every asset is scaled to
+        cacheDirectory : str
+            the directory of the saved atlases, None to not use the disk
+
+    Return
+    ------
+        images : dict
+            key : str
+                name of the image
+            value : pygame.Surface
+    """
+    names = getAssetNames(directory)
+    atlas = None
+    path = None
+    if cacheDirectory is not None:
+        prefix = "{}-{}x{}-".format(os.path.basename(os.path.normpath(directory)), size[0], size[1])
+        path = os.path.join(cacheDirectory, prefix + getAtlasKey(directory, names, size) + ".png")
+        if os.path.exists(path):
+            try:
+                atlas = pygame.image.load(path)
+            except pygame.error:
+                atlas = None
+    if atlas is None:
+        atlas = buildAtlas(directory, names, size)
+        if path is not None:
+            try:
+                os.makedirs(cacheDirectory, exist_ok=True)
+                for fileName in os.listdir(cacheDirectory):
+                    if fileName.startswith(prefix):
+                        os.remove(os.path.join(cacheDirectory, fileName))
+                pygame.image.save(atlas, path)
+            except (OSError, pygame.error):
+                pass
+
+    columns = getLayout(len(names))
+    images = {}
+    for i, fileName in enumerate(names):
+        rect = pygame.Rect(i % columns * size[0], i // columns * size[1], size[0], size[1])
+        images[fileName.split(".")[0]] = atlas.subsurface(rect)
+    return images
@@ -0,0 +1,456 @@
+import os
+import json
+import platform
+import argparse
+import tracemalloc
+from time import perf_counter
+from random import sample, Random
+from timeit import repeat
+from collections import deque
+from board import Board, numpy
+from piece import CLICKED
+from solver import Solver
+
+
+SIZES = {
+    "beginner": ((9, 9), 10),
+    "intermediate": ((16, 16), 40),
+    "expert": ((16, 30), 99),
+    "custom-max": ((99, 99), 1960),
+}
+
+
+def legacyPlacement(size, bombs):
+    """
+    Places the mines the way the board used to, testing every block against the list of mines.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the board
+        bombs : int
+            number of mines on the board
+
+    Return
+    ------
+        board : list[list[bool]]
+            a matrix marking the mines
+    """
+    bombList = sample(range(size[0] * size[1]), bombs)
+    for i in range(len(bombList)):
+        bombList[i] = (bombList[i] // size[1], bombList[i] % size[1])
+    board = []
+    for row in range(size[0]):
+        rowList = []
+        for col in range(size[1]):
+            rowList.append((row, col) in bombList)
+        board.append(rowList)
+    return board
+
+
+def placement(size, bombs):
+    """
+    Places the mines through the board buffers.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the board
+        bombs : int
+            number of mines on the board
+
+    Return
+    ------
+        mines : bytearray
+            the flat buffer marking the mines
+    """
+    board = Board.__new__(Board)
+    board.size = size
+    board.width = size[1] + 2
+    board.rng = Random()
+    board.allocate()
+    board.placeBombs(board.getBombs(bombs))
+    return board.mines
+
+
+def timeCall(function, *args, number=5, rounds=3):
+    """
+    Returns the best time in seconds of one call of the function, over a few rounds.
+
+    Parameters
+    ----------
+        function : callable
+            the function to measure
+        args : tuple
+            arguments of the function
+        number : int
+            calls per round
+        rounds : int
+            number of rounds
+    """
+    return min(repeat(lambda: function(*args), number=number, repeat=rounds)) / number
+
+
+def benchmarkPlacement():
+    """Compares the legacy mine placement with the current one on every standard board size."""
+    print("{:<14}{:>14}{:>14}{:>10}".format("board", "legacy (ms)", "current (ms)", "speedup"))
+    for name, (size, bombs) in SIZES.items():
+        legacy = timeCall(legacyPlacement, size, bombs, number=1 if bombs > 100 else 5)
+        current = timeCall(placement, size, bombs)
+        print("{:<14}{:>14.3f}{:>14.3f}{:>9.1f}x".format(name, legacy * 1000, current * 1000, legacy / current))
+
+
+def benchmarkNumbers():
+    """Checks that the vectorized numbers match the per block ones, then compares their speed."""
+    print("{:<14}{:>16}{:>16}{:>10}".format("board", "per block (ms)", "vectorized (ms)", "speedup"))
+    for name, (size, bombs) in SIZES.items():
+        board = Board(size, bombs)
+        vectorized = bytes(board.numbers)
+        board.setNumbersPerBlock()
+        for row in range(size[0]):
+            for col in range(size[1]):
+                position = board.toPosition((row, col))
+                if vectorized[position] != board.numbers[position]:
+                    raise AssertionError("numbers differ at {} on the {} board".format((row, col), name))
+        perBlock = timeCall(board.setNumbersPerBlock)
+        current = timeCall(board.setNumbers)
+        print("{:<14}{:>16.3f}{:>16.3f}{:>9.1f}x".format(name, perBlock * 1000, current * 1000, perBlock / current))
+
+
+def legacyFloodFill(board, index):
+    """
+    Opens the empty region around the given coordinates the way the board used to, with a list as queue.
+
+    Parameters
+    ----------
+        board : Board
+            the board on which the region is opened
+        index : (int, int)
+            coordinates of an empty block
+    """
+    move = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+    board.getPiece(index).setClicked()
+    q = [index]
+    while len(q) > 0:
+        first = q.pop(0)
+        for m in move:
+            pos = first[0] + m[0], first[1] + m[1]
+            if board.outOfBounds(pos):
+                continue
+            piece = board.getPiece(pos)
+            if piece.getClicked() or piece.getHasBomb() or piece.getFlagged():
+                continue
+            piece.setClicked()
+            if piece.getNumber():
+                continue
+            q.append(pos)
+
+
+def getOpening(board):
+    """
+    Returns the coordinates of the first empty block of the board, or None if there are none.
+
+    Parameters
+    ----------
+        board : Board
+            the board searched for an empty block
+    """
+    for row in range(board.getSize()[0]):
+        for col in range(board.getSize()[1]):
+            piece = board.getPiece((row, col))
+            if not piece.getHasBomb() and piece.getNumber() == 0:
+                return row, col
+    return None
+
+
+def benchmarkFloodFill():
+    """
+    Compares the legacy flood fill, the flood fill of the flat buffers and the current reveal of the
+    labeled region on the largest board with few mines.
+    """
+    print("{:<14}{:>10}{:>14}{:>12}{:>14}{:>10}".format("mines", "opened", "legacy (ms)", "fill (ms)", "current (ms)",
+                                                       "speedup"))
+    size = SIZES["custom-max"][0]
+    for bombs in (1, 10, 100, 500):
+        board = Board(size, bombs)
+        index = getOpening(board)
+        clean = bytes(board.state)
+
+        def legacy():
+            board.state[:] = clean
+            legacyFloodFill(board, index)
+
+        def fill():
+            board.state[:] = clean
+            position = board.toPosition(index)
+            board.state[position] = CLICKED
+            board.fill(deque([position]), [position])
+
+        def current():
+            board.state[:] = clean
+            board.clicked = 0
+            return board.reveal(board.toPosition(index))
+
+        opened = len(current())
+        legacyTime = timeCall(legacy, number=1)
+        fillTime = timeCall(fill)
+        currentTime = timeCall(current)
+        print("{:<14}{:>10}{:>14.3f}{:>12.3f}{:>14.3f}{:>9.1f}x".format(
+            bombs, opened, legacyTime * 1000, fillTime * 1000, currentTime * 1000, legacyTime / currentTime))
+
+
+def benchmarkText():
+    """Compares the header text drawing time per frame, loading the font every frame against the text cache."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from textcache import TextCache
+    pygame.init()
+    RED = (255, 0, 0)
+    frames = 600
+    cache = TextCache(None)
+
+    def legacy():
+        for frame in range(frames):
+            for value in (99, frame // 60):
+                pygame.font.Font(None, 20).render(str(value), True, RED)
+
+    def cached():
+        for frame in range(frames):
+            for value in (99, frame // 60):
+                cache.render(str(value), 20, RED)
+
+    legacyTime = timeCall(legacy, number=1) / frames
+    cachedTime = timeCall(cached, number=1) / frames
+    print("{:<14}{:>14}{:>14}{:>10}".format("", "legacy (us)", "cached (us)", "speedup"))
+    print("{:<14}{:>14.1f}{:>14.1f}{:>9.1f}x".format(
+        "per frame", legacyTime * 1e6, cachedTime * 1e6, legacyTime / cachedTime))
+    pygame.quit()
+
+
+def benchmarkNoGuess():
+    """Reports the attempts and the time needed to generate boards solvable without guessing."""
+    from generator import generateSolvable
+    print("{:<14}{:>10}{:>10}{:>14}{:>14}{:>10}".format(
+        "board", "attempts", "max", "mean (ms)", "max (ms)", "solvable"))
+    for name, (size, bombs) in SIZES.items():
+        runs = 5 if size == (99, 99) else 20
+        stats = [generateSolvable(size, bombs)[1] for _ in range(runs)]
+        attempts = [entry["attempts"] for entry in stats]
+        seconds = [entry["seconds"] for entry in stats]
+        print("{:<14}{:>10.1f}{:>10}{:>14.1f}{:>14.1f}{:>7}/{}".format(
+            name, sum(attempts) / runs, max(attempts), sum(seconds) / runs * 1000, max(seconds) * 1000,
+            sum(entry["solvable"] for entry in stats), runs))
+
+
+def getResidentMemory():
+    """Returns the resident memory of the process in bytes, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def benchmarkSoak(retries=5000):
+    """
+    Plays thousands of games in a row in one session of the game, a reveal then a retry each, and
+    reports the resident memory, the number of live objects and the depth of the stack along the way,
+    which must stay flat.
+    """
+    import gc
+    import sys
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from game import Game
+    from textcache import TextCache
+    size, bombs = SIZES["expert"]
+    game = Game(Board(size, bombs, True), (1000, 1000), 100, [False, 0])
+    # the header is drawn with the default font, like in benchmarkText, so the soak runs without the font asset
+    game.text = TextCache(None)
+    game.logPath = os.devnull
+    game.startSession()
+    # the boards of the session, by identity, to check that the pool keeps reusing the same ones
+    boards = set()
+    depth = [0, 0]
+
+    def profile(frame, event, arg):
+        if event == "call":
+            depth[0] += 1
+            depth[1] = max(depth[1], depth[0])
+        elif event == "return":
+            depth[0] -= 1
+
+    print("{:<10}{:>14}{:>14}{:>10}{:>10}".format("games", "memory (MB)", "objects", "depth", "boards"))
+    start = perf_counter()
+    for played in range(1, retries + 1):
+        center = size[1] * game.pieceSize[0] // 2, game.offset + size[0] * game.pieceSize[1] // 2
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=center, button=1))
+        game.step()
+        if game.placement is not None:
+            # the mines are placed on a thread, the reveal is played by the next step once they are
+            game.placement.join()
+            game.step()
+        # the retry button of the header
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(425, 50), button=1))
+        report = played == 1 or played % (retries // 5 or 1) == 0
+        if report:
+            depth[:] = [0, 0]
+            sys.setprofile(profile)
+        game.step()
+        if report:
+            sys.setprofile(None)
+            gc.collect()
+            memory = getResidentMemory()
+            print("{:<10}{:>14}{:>14}{:>10}{:>10}".format(
+                played, "-" if memory is None else "{:.1f}".format(memory / 2 ** 20), len(gc.get_objects()),
+                depth[1], len(boards)))
+        boards.add(id(game.board))
+    seconds = perf_counter() - start
+    game.endSession()
+    print("{:.0f} games per second, {} distinct boards".format(retries / seconds, len(boards)))
+
+
+def getPercentile(values, percentile):
+    """
+    Returns the value at the given percentile of the sorted values.
+
+    Parameters
+    ----------
+        values : list[float]
+            sorted values
+        percentile : float
+            between 0 and 100
+    """
+    return values[min(len(values) - 1, int(round(percentile / 100 * (len(values) - 1))))]
+
+
+def measure(operation, setup, runs):
+    """
+    Measures an operation over a number of runs, every run on a fresh input.
+
+    The peak memory is measured on a separate run, since tracing the allocations slows the operation.
+
+    Parameters
+    ----------
+        operation : callable
+            the measured function, called with the value returned by setup
+        setup : callable
+            returns the input of one run, its time is not measured
+        runs : int
+            number of measured runs
+
+    Return
+    ------
+        result : dict
+            ops_per_sec, p50_us, p99_us and peak_kb of the operation
+    """
+    latencies = []
+    for _ in range(runs):
+        value = setup()
+        start = perf_counter()
+        operation(value)
+        latencies.append(perf_counter() - start)
+    latencies.sort()
+    value = setup()
+    tracemalloc.start()
+    operation(value)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "ops_per_sec": runs / sum(latencies),
+        "p50_us": getPercentile(latencies, 50) * 1e6,
+        "p99_us": getPercentile(latencies, 99) * 1e6,
+        "peak_kb": peak / 1024,
+    }
+
+
+def getPlayedBoard(size, bombs):
+    """
+    Returns a new board and the coordinates of its first empty block, after which the board is hidden again.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the board
+        bombs : int
+            number of mines on the board
+    """
+    board = Board(size, bombs, True, True)
+    board.place((size[0] // 2, size[1] // 2))
+    return board, (size[0] // 2, size[1] // 2)
+
+
+def benchmarkSuite(runs=200, output=None):
+    """
+    Measures the construction of the board, the numbers, the opening of a region, the win check and the
+    solver on every standard board size, on a new random board for every run.
+
+    Parameters
+    ----------
+        runs : int
+            number of measured runs of every operation
+        output : str
+            path of the JSON file the results are written to, None to only print them
+    """
+    def reveal(value):
+        board, index = value
+        board.handleClick(board.getPiece(index), index, False)
+
+    def solve(value):
+        board, index = value
+        Solver(board).play(board.toPosition(index))
+
+    results = {}
+    print("{:<14}{:<14}{:>12}{:>12}{:>12}{:>12}".format("board", "operation", "ops/sec", "p50 (us)", "p99 (us)", "peak (KB)"))
+    for name, (size, bombs) in SIZES.items():
+        count = max(5, runs // 20) if size == (99, 99) else runs
+        operations = {
+            "construct": (lambda value: Board(size, bombs), lambda: None),
+            "numbers": (lambda board: board.setNumbers(), lambda: Board(size, bombs)),
+            "reveal": (reveal, lambda: getPlayedBoard(size, bombs)),
+            "wincheck": (lambda board: board.getWon(), lambda: Board(size, bombs)),
+            "solve": (solve, lambda: getPlayedBoard(size, bombs)),
+        }
+        results[name] = {}
+        for operation, (function, setup) in operations.items():
+            result = measure(function, setup, count)
+            results[name][operation] = result
+            print("{:<14}{:<14}{:>12.0f}{:>12.1f}{:>12.1f}{:>12.1f}".format(
+                name, operation, result["ops_per_sec"], result["p50_us"], result["p99_us"], result["peak_kb"]))
+    if output is not None:
+        report = {
+            "python": platform.python_version(),
+            "numpy": numpy is not None,
+            "runs": runs,
+            "results": results,
+        }
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+BENCHMARKS = {
+    "placement": benchmarkPlacement,
+    "numbers": benchmarkNumbers,
+    "floodfill": benchmarkFloodFill,
+    "text": benchmarkText,
+    "noguess": benchmarkNoGuess,
+    "soak": benchmarkSoak,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks of the board, the solver and the drawing helpers.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run: suite, " + ", ".join(BENCHMARKS.keys()))
+    parser.add_argument("--runs", type=int, default=200, help="measured runs of every operation of the suite")
+    parser.add_argument("--json", help="file the results of the suite are written to")
+    options = parser.parse_args()
+    for name in options.names or ["suite"]:
+        if name != "suite" and name not in BENCHMARKS:
+            parser.error("unknown benchmark " + name)
+    for name in options.names or ["suite"]:
+        print("==", name)
+        if name == "suite":
+            benchmarkSuite(options.runs, options.json)
+        else:
+            BENCHMARKS[name]()
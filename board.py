@@ -1,5 +1,13 @@
-from piece import Piece
-from random import sample
+from piece import Piece, HIDDEN, CLICKED, FLAGGED, BORDER
+from random import Random, getrandbits
+from array import array
+from operator import add, or_
+from collections import deque
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class Board:
@@ -12,39 +20,110 @@ class Board:
             a check if the state of the board results in a lost game
         won : bool
             a check if the state of the board results in a won game
-        board : list[list[Piece]
-            a matrix representing the board
         size : (int, int)
             width and height of the board
+        width : int
+            number of columns of the flat buffers, including the border
+        offsets : (int, int, int, int, int, int, int, int)
+            offsets in the flat buffers of the eight neighbours of a block
+        changed : list[int]
+            positions of the blocks revealed or flagged since the last call of popChanged
+        mines : bytearray
+            flat buffer marking the mines on the board
+        numbers : bytearray
+            flat buffer holding the number of mines around every block
+        state : bytearray
+            flat buffer holding the state of every block (HIDDEN, CLICKED, FLAGGED or BORDER)
+        hidden : bytes
+            the state buffer of the board with every block hidden
         numberOfBombs : int
             number of bombs on the board
         spaces : int
             number of non-mines on the board
         clicked : int
             number of clicked blocks by the user
+        deferred : bool
+            represents if the mines are still to be placed, on the first reveal
+        safeArea : bool
+            represents if the whole 3x3 area around the first reveal is kept free of mines
+        seed : int
+            seed of the layout of the mines, together with the first click on a deferred board
+        rng : random.Random
+            the generator the mines are placed with, seeded with seed on every placement
+        firstClick : (int, int)
+            coordinates the mines were placed away from, None if they were placed before any click
+        regions : list[(int, array.array)]
+            for every empty region, the number of its empty blocks and the positions of its empty blocks
+            followed by the numbers around it, None until the mines are placed, or until they are first
+            needed on a loaded board
+        labels : array.array
+            flat buffer holding the index in regions of the region of every empty block, -1 for the
+            other blocks, None until the regions are labeled
+        minePositions : list[int]
+            positions of the mines in the flat buffers, None until they are placed or first needed
 
     Methods
     -------
         setBoard():
             Sets the board up if the size of board is not custom.
+        place(index):
+            Places the mines, keeping the block at the given coordinates free of them.
+        getSafeArea(index):
+            Returns the blocks kept free of mines around the first click.
+        allocate():
+            Allocates the flat buffers of the board.
+        resetState():
+            Hides every block again and clears the flags, keeping the mines.
+        reset(seed):
+            Starts a new game on the board, reusing its buffers.
+        toPosition(index):
+            Returns the position in the flat buffers of the block at the given coordinates.
+        toIndex(position):
+            Returns the coordinates of the block at the given position in the flat buffers.
         getSize():
             Return the size of board
         getNumberOfBombs(size):
             Determines and returns the number of mines relative to the side of the board.
         getNoBombs():
             Returns the number of mines on the board
-        getBombs(bombs):
-            Returns a list of the coordinates of the mines
+        getBombs(bombs, excluded):
+            Returns a list of the positions of the mines in the flat buffers.
+        placeBombs(positions):
+            Marks the mines at the given positions.
+        getMinePositions():
+            Returns the positions of the mines in the flat buffers.
         getPiece(index):
             Returns the piece at the given index.
         setNumbers():
             Determines the values of the non-mines blocks.
+        setNumbersPerBlock():
+            Determines the values of the non-mines blocks one block at a time.
+        labelRegions():
+            Finds the empty regions of the board.
+        getOpenings():
+            Returns the number of empty regions of the board.
+        getMetrics():
+            Returns the 3BV, openings, isolated numbers and mine density of the board.
         getNumber(index):
             Returns the number of mines around the Piece at the given index.
+        getOffsets():
+            Returns the offsets in the flat buffers of the eight neighbours of a block.
         outOfBounds(index):
             Checks if the given coordinates are outside the board.
         handleClick(piece, index, flag):
             Interprets the user click at a given position and updates the board accordingly.
+        toggleFlag(position):
+            Flips the flag of the hidden block at the given position.
+        reveal(position):
+            Reveals the block at the given position and the empty region around it.
+        chord(position):
+            Reveals the unflagged neighbours of a revealed number that has as many flags around it.
+        openRegion(position, revealed):
+            Reveals the region of the revealed empty block at the given position.
+        fill(q, revealed):
+            Reveals the empty regions around the revealed empty blocks of the queue.
+        popChanged():
+            Returns the positions of the blocks changed since the last call and forgets them.
         getWon():
             Checks if the win condition has been achieved.
         setWon(won):
@@ -53,36 +132,157 @@ class Board:
             Returns the status regarding the lost status.
         setLost(lost):
             Sets the won stats to the parameter.
-        setBombs(bombs):
+        setBombs(bombs, excluded):
             Sets the number of mines to the parameters and generates bombs coordinates for the mines.
     """
-    def __init__(self, size, custom):
+    def __init__(self, size, custom, deferred=False, safeArea=False, seed=None):
         self.lost = False
         self.won = False
-        self.board = None
         self.size = size
+        self.width = size[1] + 2
+        self.offsets = self.getOffsets()
+        self.changed = []
+        self.mines = None
+        self.numbers = None
+        self.state = None
+        self.hidden = None
         self.numberOfBombs = self.getNumberOfBombs(self.size) if not custom else custom
         self.spaces = self.size[0] * self.size[1] - self.numberOfBombs
         self.clicked = 0
-        if custom:
-            self.setBombs(custom)
-        else:
-            self.setBoard()
+        self.deferred = deferred
+        self.safeArea = safeArea
+        self.seed = seed if seed is not None else getrandbits(32)
+        self.rng = Random(self.seed)
+        self.firstClick = None
+        self.regions = None
+        self.labels = None
+        self.minePositions = None
+        self.allocate()
+        if not deferred:
+            self.place()
 
     def setBoard(self):
-        self.board = []
-        bombs = self.getBombs(self.numberOfBombs)
-        for row in range(self.size[0]):
-            rowList = []
-            for col in range(self.size[1]):
-                piece = None
-                if (row, col) in bombs:
-                    piece = Piece(True)
-                else:
-                    piece = Piece(False)
-                rowList.append(piece)
-            self.board.append(rowList)
-        self.setNumbers()
+        self.setBombs(self.numberOfBombs)
+
+    def place(self, index=None):
+        """
+        Places the mines, keeping the block at the given coordinates free of them.
+
+        The layout only depends on the seed, the size, the number of mines and the given coordinates.
+
+        Parameters
+        ----------
+            index : (int, int)
+                coordinates of the first click, None if the mines are placed before any click
+        """
+        self.deferred = False
+        self.firstClick = index
+        self.rng.seed(self.seed)
+        excluded = self.getSafeArea(index) if index is not None else ()
+        self.setBombs(self.numberOfBombs, excluded)
+
+    def getSafeArea(self, index):
+        """
+        Returns the blocks kept free of mines around the first click.
+
+        The whole 3x3 area around the block is kept free when safeArea is set and the board has room
+        for it, otherwise only the block itself is kept free, if the board has room for it.
+
+        Parameters
+        ----------
+            index : (int, int)
+                coordinates of the first click
+
+        Return
+        ------
+            area : list[(int, int)]
+        """
+        cells = self.size[0] * self.size[1]
+        if self.safeArea:
+            area = [(index[0] + i, index[1] + j) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                    if not self.outOfBounds((index[0] + i, index[1] + j))]
+            if cells - len(area) >= self.numberOfBombs:
+                return area
+        if cells > self.numberOfBombs:
+            return [index]
+        return []
+
+    def allocate(self):
+        """
+        Allocates the flat buffers of the board.
+
+        Every buffer keeps a border of one block around the board, so the neighbours of any block
+        can be reached with constant offsets. The border blocks never hold a mine and are marked
+        with the BORDER state so they are never revealed.
+        """
+        cells = (self.size[0] + 2) * self.width
+        self.mines = bytearray(cells)
+        self.numbers = bytearray(cells)
+        self.state = bytearray(cells)
+        last = cells - self.width
+        self.state[:self.width] = bytes([BORDER]) * self.width
+        self.state[last:] = bytes([BORDER]) * self.width
+        self.state[self.width::self.width] = bytes([BORDER]) * (self.size[0] + 1)
+        self.state[self.width - 1::self.width] = bytes([BORDER]) * (self.size[0] + 2)
+        self.hidden = bytes(self.state)
+
+    def resetState(self):
+        """Hides every block again and clears the flags, keeping the mines."""
+        self.state[:] = self.hidden
+        self.clicked = 0
+        self.lost = False
+        self.won = False
+        self.changed = []
+
+    def reset(self, seed=None):
+        """
+        Starts a new game on the board, reusing its buffers: every block is hidden again and the mines
+        are cleared, to be placed on the first reveal from the new seed.
+
+        Parameters
+        ----------
+            seed : int
+                seed of the new layout, a random one if None
+        """
+        self.resetState()
+        self.mines[:] = bytes(len(self.mines))
+        self.deferred = True
+        self.seed = seed if seed is not None else getrandbits(32)
+        self.rng.seed(self.seed)
+        self.firstClick = None
+        self.regions = None
+        self.labels = None
+        self.minePositions = None
+
+    def toPosition(self, index):
+        """
+        Returns the position in the flat buffers of the block at the given coordinates.
+
+        Parameters
+        ----------
+            index : (int, int)
+                coordinates of the block
+
+        Return
+        ------
+            position : int
+        """
+        return (index[0] + 1) * self.width + index[1] + 1
+
+    def toIndex(self, position):
+        """
+        Returns the coordinates of the block at the given position in the flat buffers.
+
+        Parameters
+        ----------
+            position : int
+                position of the block in the flat buffers
+
+        Return
+        ------
+            index : (int, int)
+        """
+        return position // self.width - 1, position % self.width - 1
 
     def getSize(self):
         return self.size
@@ -101,22 +301,184 @@ class Board:
     def getNoBombs(self):
         return self.numberOfBombs
 
-    def getBombs(self, bombs):
-        bombList = sample(range(self.size[0] * self.size[1]), bombs)
-        for i in range(len(bombList)):
-            bombList[i] = (bombList[i] // self.size[1], bombList[i] % self.size[1])
-        return bombList
+    def getBombs(self, bombs, excluded=()):
+        """
+        Returns a list of the positions of the mines in the flat buffers.
+
+        Parameters
+        ----------
+            bombs : int
+                number of mines to generate
+            excluded : collection[(int, int)]
+                coordinates of the blocks that must not hold a mine
+
+        Return
+        ------
+            bombList : list[int]
+        """
+        cols = self.size[1]
+        width = self.width
+        cells = range(self.size[0] * cols)
+        if excluded:
+            excluded = {index[0] * cols + index[1] for index in excluded}
+            cells = [cell for cell in cells if cell not in excluded]
+        return [(cell // cols + 1) * width + cell % cols + 1 for cell in self.rng.sample(cells, bombs)]
+
+    def placeBombs(self, positions):
+        """
+        Marks the mines at the given positions, in time linear in the number of mines.
+
+        Parameters
+        ----------
+            positions : list[int]
+                positions of the mines in the flat buffers
+        """
+        mines = self.mines
+        for position in positions:
+            mines[position] = 1
+
+    def getMinePositions(self):
+        """
+        Returns the positions of the mines in the flat buffers, kept from their placement.
+
+        Return
+        ------
+            positions : list[int]
+                empty while the mines are not placed
+        """
+        if self.minePositions is None:
+            mines = self.mines
+            self.minePositions = [position for position in range(len(mines)) if mines[position]]
+        return self.minePositions
 
     def getPiece(self, index):
-        return self.board[index[0]][index[1]]
+        return Piece(self, self.toPosition(index))
 
     def setNumbers(self):
-        """Determines the values of the non-mines blocks."""
+        """
+        Determines the values of the non-mines blocks.
+
+        The values are computed in a single pass as the sum of the mine buffer shifted by each neighbour
+        offset. NumPy is used when it is available, otherwise the shifted slices are added with map.
+        The blocks of the side border receive meaningless values, which are never read.
+        """
+        start = self.width + 1
+        end = len(self.mines) - self.width - 1
+        offsets = self.offsets
+        if numpy is not None:
+            mines = numpy.frombuffer(self.mines, dtype=numpy.uint8)
+            counts = numpy.zeros(end - start, dtype=numpy.uint8)
+            for offset in offsets:
+                counts += mines[start + offset:end + offset]
+            numpy.frombuffer(self.numbers, dtype=numpy.uint8)[start:end] = counts
+            return
+        mines = self.mines
+        counts = mines[start + offsets[0]:end + offsets[0]]
+        for offset in offsets[1:]:
+            counts = map(add, counts, mines[start + offset:end + offset])
+        self.numbers[start:end] = bytes(counts)
+
+    def setNumbersPerBlock(self):
+        """Determines the values of the non-mines blocks one block at a time, using getNumber."""
         for row in range(self.size[0]):
             for col in range(self.size[1]):
                 index = (row, col)
-                value = self.getNumber(index)
-                self.getPiece(index).setNumber(value)
+                self.numbers[self.toPosition(index)] = self.getNumber(index)
+
+    def labelRegions(self):
+        """
+        Finds the empty regions of the board and the numbers around them, once the mines are placed.
+
+        Every empty block is labeled with its region by a depth-first fill over a mask of the blocks
+        that are not empty. Every region is then stored as a single array of its empty blocks followed
+        by the numbers around it, so revealing an empty block reveals its region with one check per
+        block, or one vectorized assignment with NumPy, instead of a flood fill.
+        """
+        offsets = self.offsets
+        hidden = self.hidden
+        # a block is not empty if it has a mine or mines around it, or if it is on the border
+        blocked = bytearray(map(or_, map(or_, self.numbers, self.mines), hidden))
+        labels = array("i", [-1]) * len(blocked)
+        regions = []
+        find = blocked.find
+        position = find(0)
+        while position >= 0:
+            label = len(regions)
+            blocked[position] = 1
+            labels[position] = label
+            blocks = array("i", [position])
+            border = set()
+            stack = [position]
+            pop = stack.pop
+            push = stack.append
+            while stack:
+                first = pop()
+                for offset in offsets:
+                    neighbour = first + offset
+                    if not blocked[neighbour]:
+                        blocked[neighbour] = 1
+                        labels[neighbour] = label
+                        blocks.append(neighbour)
+                        push(neighbour)
+                    elif labels[neighbour] < 0 and hidden[neighbour] != BORDER:
+                        # the neighbours of an empty block are never mines, so this is a number
+                        border.add(neighbour)
+            zeros = len(blocks)
+            blocks.extend(sorted(border))
+            regions.append((zeros, blocks))
+            position = find(0, position)
+        self.regions = regions
+        self.labels = labels
+
+    def getOpenings(self):
+        """
+        Returns the number of empty regions of the board, each opened by a single click.
+
+        Return
+        ------
+            openings : int
+                0 while the mines are not placed
+        """
+        if self.deferred:
+            return 0
+        if self.regions is None:
+            self.labelRegions()
+        return len(self.regions)
+
+    def getMetrics(self):
+        """
+        Returns the difficulty metrics of the board, in one pass over its labeled regions.
+
+        Every opening takes one click and every number that touches no empty block takes one more, so
+        the 3BV, the minimum number of clicks to reveal the board, is the sum of both.
+
+        Return
+        ------
+            metrics : dict
+                3bv : minimum number of left clicks that reveal every block without a mine
+                openings : number of empty regions
+                isolated : number of numbers that touch no empty block
+                density : mines per block
+            None while the mines are not placed
+        """
+        if self.deferred:
+            return None
+        if self.regions is None:
+            self.labelRegions()
+        # a number can touch several regions, the empty blocks belong to a single one
+        empty = 0
+        numbers = set()
+        for zeros, blocks in self.regions:
+            empty += zeros
+            numbers.update(blocks[zeros:])
+        openings = len(self.regions)
+        isolated = self.spaces - empty - len(numbers)
+        return {
+            "3bv": openings + isolated,
+            "openings": openings,
+            "isolated": isolated,
+            "density": self.numberOfBombs / (self.size[0] * self.size[1]),
+        }
 
     def getNumber(self, index):
         """
@@ -132,15 +494,24 @@ class Board:
             value : int
                 number of mines around the piece
         """
-        move = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+        position = self.toPosition(index)
+        mines = self.mines
         value = 0
-        for m in move:
-            pos = (index[0] + m[0], index[1] + m[1])
-            if not self.outOfBounds(pos):
-                if self.getPiece(pos).getHasBomb():
-                    value += 1
+        for offset in self.offsets:
+            value += mines[position + offset]
         return value
 
+    def getOffsets(self):
+        """
+        Returns the offsets in the flat buffers of the eight neighbours of a block.
+
+        Return
+        ------
+            offsets : (int, int, int, int, int, int, int, int)
+        """
+        w = self.width
+        return -w, -w + 1, 1, w + 1, w, w - 1, -1, -w - 1
+
     def outOfBounds(self, index):
         """
         Checks if the given coordinates are outside the board.
@@ -178,36 +549,194 @@ class Board:
             -1 or 1 if the click was a right click
             0 elsewhere
         """
-        if piece.getClicked() or (not flag and piece.getFlagged()):
+        position = piece.position
+        state = self.state
+        if state[position] == CLICKED or (not flag and state[position] == FLAGGED):
             return 0
         if flag:
-            piece.setFlag()
-            return -1 if piece.getFlagged() else 1
-        piece.setClicked()
-        if piece.getHasBomb():
+            return self.toggleFlag(position)
+        self.reveal(position)
+        return 0
+
+    def toggleFlag(self, position):
+        """
+        Flips the flag of the hidden block at the given position.
+
+        Parameters
+        ----------
+            position : int
+                position of the block in the flat buffers
+
+        Return
+        ------
+            -1 if the block has been flagged, 1 if the flag has been removed
+            0 if the block is already revealed
+        """
+        state = self.state
+        if state[position] == HIDDEN:
+            state[position] = FLAGGED
+            self.changed.append(position)
+            return -1
+        if state[position] == FLAGGED:
+            state[position] = HIDDEN
+            self.changed.append(position)
+            return 1
+        return 0
+
+    def reveal(self, position):
+        """
+        Reveals the block at the given position and, if it has no mines around, the empty region around it.
+        On a deferred board, the mines are placed first, away from the block.
+
+        Parameters
+        ----------
+            position : int
+                position of the block in the flat buffers
+
+        Return
+        ------
+            revealed : list[int]
+                positions of the newly revealed blocks
+        """
+        state = self.state
+        if state[position] != HIDDEN:
+            return []
+        if self.deferred:
+            self.place(self.toIndex(position))
+        state[position] = CLICKED
+        revealed = [position]
+        if self.mines[position]:
             self.lost = True
-            return 0
-        self.clicked += 1
-        if piece.getNumber() != 0:
-            return 0
-        move = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
-        q = []
-        q.append(index)
-        while len(q) > 0:
-            first = q.pop(0)
-            for m in move:
-                pos = first[0] + m[0], first[1] + m[1]
-                if self.outOfBounds(pos):
-                    continue
-                piece2 = self.getPiece(pos)
-                if piece2.getClicked() or piece2.getHasBomb() or piece2.getFlagged():
-                    continue
-                piece2.setClicked()
-                self.clicked += 1
-                if piece2.getNumber():
+            self.changed.append(position)
+            return revealed
+        if self.numbers[position] == 0:
+            self.openRegion(position, revealed)
+        self.clicked += len(revealed)
+        self.changed.extend(revealed)
+        return revealed
+
+    def chord(self, position):
+        """
+        Reveals the unflagged neighbours of a revealed number that has as many flags around it.
+
+        The neighbours are revealed in a single batch: the regions of the empty ones are opened once,
+        and the combined blocks are reported as changed together.
+        A wrongly flagged number reveals its mines and loses the game.
+
+        Parameters
+        ----------
+            position : int
+                position of the number in the flat buffers
+
+        Return
+        ------
+            revealed : list[int]
+                positions of the newly revealed blocks
+        """
+        state = self.state
+        numbers = self.numbers
+        if state[position] != CLICKED or numbers[position] == 0:
+            return []
+        neighbours = [position + offset for offset in self.offsets]
+        if sum(state[neighbour] == FLAGGED for neighbour in neighbours) != numbers[position]:
+            return []
+        mines = self.mines
+        empty = []
+        revealed = []
+        exploded = 0
+        for neighbour in neighbours:
+            if state[neighbour] != HIDDEN:
+                continue
+            state[neighbour] = CLICKED
+            revealed.append(neighbour)
+            if mines[neighbour]:
+                exploded += 1
+            elif not numbers[neighbour]:
+                empty.append(neighbour)
+        if exploded:
+            self.lost = True
+        for neighbour in empty:
+            self.openRegion(neighbour, revealed)
+        self.clicked += len(revealed) - exploded
+        self.changed.extend(revealed)
+        return revealed
+
+    def openRegion(self, position, revealed):
+        """
+        Reveals the region of the revealed empty block at the given position.
+
+        The stored blocks of the region are revealed in one pass, as a single vectorized assignment when
+        NumPy is available. A flag on one of its empty blocks stops the spread of the region, so the
+        region is then filled from the block instead.
+
+        Parameters
+        ----------
+            position : int
+                position of the empty block in the flat buffers, already revealed
+            revealed : list[int]
+                the newly revealed blocks are appended to it
+        """
+        state = self.state
+        if self.regions is None:
+            self.labelRegions()
+        zeros, blocks = self.regions[self.labels[position]]
+        if numpy is not None:
+            view = numpy.frombuffer(state, dtype=numpy.uint8)
+            positions = numpy.frombuffer(blocks, dtype=numpy.intc)
+            if (view[positions[:zeros]] == FLAGGED).any():
+                self.fill(deque([position]), revealed)
+                return
+            positions = positions[view[positions] == HIDDEN]
+            view[positions] = CLICKED
+            revealed.extend(positions.tolist())
+            return
+        if FLAGGED in map(state.__getitem__, blocks[:zeros]):
+            self.fill(deque([position]), revealed)
+            return
+        positions = [pos for pos in blocks if state[pos] == HIDDEN]
+        for pos in positions:
+            state[pos] = CLICKED
+        revealed.extend(positions)
+
+    def fill(self, q, revealed):
+        """
+        Reveals the empty regions around the revealed empty blocks of the queue.
+
+        Parameters
+        ----------
+            q : deque[int]
+                positions of the revealed empty blocks whose neighbours are still to be revealed
+            revealed : list[int]
+                the newly revealed blocks are appended to it
+        """
+        state = self.state
+        numbers = self.numbers
+        offsets = self.offsets
+        popleft = q.popleft
+        append = q.append
+        # the neighbours of an empty block are never mines, so only the state needs checking
+        while q:
+            first = popleft()
+            for offset in offsets:
+                pos = first + offset
+                if state[pos] != HIDDEN:
                     continue
-                q.append(pos)
-        return 0
+                state[pos] = CLICKED
+                revealed.append(pos)
+                if not numbers[pos]:
+                    append(pos)
+
+    def popChanged(self):
+        """
+        Returns the positions of the blocks changed since the last call and forgets them.
+
+        Return
+        ------
+            changed : list[int]
+        """
+        changed = self.changed
+        self.changed = []
+        return changed
 
     def getWon(self):
         """
@@ -238,20 +767,21 @@ class Board:
         """Sets the won stats to the parameter."""
         self.lost = lost
 
-    def setBombs(self, bombs):
-        """Sets the number of mines to the parameters and generates bombs coordinates for the mines."""
+    def setBombs(self, bombs, excluded=()):
+        """
+        Sets the number of mines to the parameters and generates bombs coordinates for the mines.
+
+        Parameters
+        ----------
+            bombs : int
+                number of mines to generate
+            excluded : collection[(int, int)]
+                coordinates of the blocks that must not hold a mine
+        """
         self.numberOfBombs = bombs
-        mines = self.getBombs(bombs)
-        self.board = []
-        for row in range(self.size[0]):
-            rowList = []
-            for col in range(self.size[1]):
-                piece = None
-                if (row, col) in mines:
-                    piece = Piece(True)
-                else:
-                    piece = Piece(False)
-                rowList.append(piece)
-            self.board.append(rowList)
+        self.spaces = self.size[0] * self.size[1] - bombs
+        self.mines[:] = bytes(len(self.mines))
+        self.minePositions = self.getBombs(bombs, excluded)
+        self.placeBombs(self.minePositions)
         self.setNumbers()
-
+        self.labelRegions()
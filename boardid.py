@@ -0,0 +1,105 @@
+from board import Board
+from generator import NoGuessBoard
+
+# the largest side of the boards of the menu, and the seeds that fit in the save and replay formats
+MAX_SIDE = 99
+MAX_SEED = 2 ** 64 - 1
+
+
+def getBoardId(board):
+    """
+    Returns the compact id of the board, from which newBoard regenerates the exact layout.
+
+    The id is made of the size, the number of mines and the seed in hexadecimal, followed by the flags
+    of the board after a colon (n for a board solvable without guessing, s for a safe 3x3 area around
+    the first click, p for mines placed before any click) and by the first click after an at sign:
+        16x30-99-3f9a1c:s@8.15
+
+    Parameters
+    ----------
+        board : Board
+
+    Return
+    ------
+        boardId : str
+    """
+    size = board.getSize()
+    boardId = "{}x{}-{}-{:x}".format(size[0], size[1], board.getNoBombs(), board.seed)
+    flags = ""
+    if isinstance(board, NoGuessBoard):
+        flags += "n"
+    if board.safeArea:
+        flags += "s"
+    if not board.deferred and board.firstClick is None:
+        flags += "p"
+    if flags:
+        boardId += ":" + flags
+    if board.firstClick is not None:
+        boardId += "@{}.{}".format(board.firstClick[0], board.firstClick[1])
+    return boardId
+
+
+def parseBoardId(boardId):
+    """
+    Returns the fields of a board id, raising ValueError if the id is malformed or out of range: the
+    sides are at most MAX_SIDE, like on the menu, and the seed at most MAX_SEED.
+
+    Parameters
+    ----------
+        boardId : str
+
+    Return
+    ------
+        (size, mines, seed, flags, firstClick) : ((int, int), int, int, str, (int, int))
+            firstClick is None if the id has none
+    """
+    text = boardId.strip()
+    try:
+        firstClick = None
+        if "@" in text:
+            text, click = text.split("@")
+            row, col = click.split(".")
+            firstClick = int(row), int(col)
+        flags = ""
+        if ":" in text:
+            text, flags = text.split(":")
+        size, mines, seed = text.split("-")
+        rows, cols = size.split("x")
+        size = int(rows), int(cols)
+        mines = int(mines)
+        seed = int(seed, 16)
+    except ValueError:
+        raise ValueError("malformed board id " + repr(boardId))
+    if set(flags) - set("nsp") or min(size) < 1 or not 0 < mines <= size[0] * size[1]:
+        raise ValueError("malformed board id " + repr(boardId))
+    if max(size) > MAX_SIDE or seed > MAX_SEED:
+        raise ValueError("board id out of range " + repr(boardId))
+    if firstClick is not None and not (0 <= firstClick[0] < size[0] and 0 <= firstClick[1] < size[1]):
+        raise ValueError("malformed board id " + repr(boardId))
+    return size, mines, seed, flags, firstClick
+
+
+def newBoard(boardId):
+    """
+    Returns the board of the given id.
+
+    The mines are placed right away if the id has a first click or the p flag, otherwise they are
+    placed on the first reveal like on any deferred board.
+
+    Parameters
+    ----------
+        boardId : str
+
+    Return
+    ------
+        board : Board
+    """
+    size, mines, seed, flags, firstClick = parseBoardId(boardId)
+    safeArea = "s" in flags
+    if "n" in flags:
+        board = NoGuessBoard(size, mines, True, safeArea, seed=seed)
+    else:
+        board = Board(size, mines, True, safeArea, seed=seed)
+    if firstClick is not None or "p" in flags:
+        board.place(firstClick)
+    return board
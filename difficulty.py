@@ -0,0 +1,138 @@
+import os
+import json
+import argparse
+from bisect import bisect_right
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from board import Board
+from boardid import getBoardId
+from simulate import DIFFICULTIES
+
+
+def scoreShard(size, mines, seeds, firstClick=None):
+    """
+    Returns the metrics of the board of every seed, in a worker process.
+
+    A single board is reused, only its mines are placed again for every seed.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the boards
+        mines : int
+            number of mines on the boards
+        seeds : list[int]
+            seeds of the boards
+        firstClick : (int, int)
+            coordinates the mines are placed away from, None to place them before any click
+
+    Return
+    ------
+        scores : list[dict]
+            the id of every board and its metrics
+    """
+    board = Board(size, mines, True)
+    scores = []
+    for seed in seeds:
+        board.seed = seed
+        board.place(firstClick)
+        score = board.getMetrics()
+        score["id"] = getBoardId(board)
+        scores.append(score)
+    return scores
+
+
+def scoreBoards(size, mines, seeds, firstClick=None, workers=None, shardSize=2000):
+    """
+    Returns the metrics of the boards of the given seeds, computed on a pool of processes.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the boards
+        mines : int
+            number of mines on the boards
+        seeds : sequence[int]
+            seeds of the boards
+        firstClick : (int, int)
+            coordinates the mines are placed away from, None to place them before any click
+        workers : int
+            number of processes, the number of processors if None
+        shardSize : int
+            number of boards scored by a worker at a time
+
+    Return
+    ------
+        scores : list[dict]
+            the id of every board and its metrics, in the order of the seeds
+    """
+    seeds = list(seeds)
+    shards = [seeds[i:i + shardSize] for i in range(0, len(seeds), shardSize)]
+    if len(shards) <= 1:
+        return scoreShard(size, mines, seeds, firstClick)
+    scores = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(scoreShard, [size] * len(shards), [mines] * len(shards), shards,
+                                   [firstClick] * len(shards)):
+            scores.extend(result)
+    return scores
+
+
+def bucketBoards(scores, edges, key="3bv"):
+    """
+    Splits scored boards into difficulty buckets.
+
+    Parameters
+    ----------
+        scores : list[dict]
+            the output of scoreBoards
+        edges : list[float]
+            increasing bounds between the buckets, a board equal to a bound goes to the bucket above it
+        key : str
+            the metric the boards are bucketed by
+
+    Return
+    ------
+        buckets : list[list[str]]
+            the ids of the boards of every bucket, len(edges) + 1 buckets
+    """
+    buckets = [[] for _ in range(len(edges) + 1)]
+    for score in scores:
+        buckets[bisect_right(edges, score[key])].append(score["id"])
+    return buckets
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scores seeded boards by difficulty and buckets them.")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES.keys(), default="expert")
+    parser.add_argument("--boards", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first board")
+    parser.add_argument("--first-click", type=int, nargs=2, metavar=("ROW", "COL"),
+                        help="coordinates the mines are placed away from")
+    parser.add_argument("--edges", type=float, nargs="+", help="bounds between the buckets, the quartiles if omitted")
+    parser.add_argument("--key", choices=("3bv", "openings", "isolated"), default="3bv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="JSON lines file the metrics of every board are written to")
+    options = parser.parse_args()
+
+    size, mines = DIFFICULTIES[options.difficulty]
+    firstClick = tuple(options.first_click) if options.first_click is not None else None
+    start = perf_counter()
+    scores = scoreBoards(size, mines, range(options.seed, options.seed + options.boards), firstClick, options.workers)
+    seconds = perf_counter() - start
+    if options.output is not None:
+        with open(options.output, "w") as file:
+            for score in scores:
+                file.write(json.dumps(score) + "\n")
+    edges = options.edges
+    if edges is None:
+        values = sorted(score[options.key] for score in scores)
+        edges = [values[len(values) * quarter // 4] for quarter in (1, 2, 3)]
+    buckets = bucketBoards(scores, edges, options.key)
+    print(json.dumps({
+        "boards": len(scores),
+        "boardsPerSecond": len(scores) / seconds,
+        "mean": sum(score[options.key] for score in scores) / len(scores),
+        "edges": edges,
+        "buckets": [len(bucket) for bucket in buckets],
+    }, indent=2))
@@ -0,0 +1,206 @@
+from board import Board
+from piece import CLICKED, FLAGGED
+
+
+class Engine:
+    """
+    A class used to play a game of Minesweeper on a board, without any rendering.
+
+    The engine only depends on the board, so games can be simulated without pygame being imported.
+    The numbers of the hidden blocks are never exposed through the engine.
+
+    Attributes
+    ----------
+        board : Board
+            the board the game is played on
+        flags : int
+            number of flags placed on the board
+
+    Methods
+    -------
+        new(size, mines, deferred):
+            Returns an engine playing on a new board.
+        getPosition(row, col):
+            Returns the position of the block in the flat buffers of the board.
+        reveal(row, col):
+            Reveals the block at the given coordinates.
+        flag(row, col):
+            Flips the flag of the block at the given coordinates.
+        chord(row, col):
+            Reveals the unflagged neighbours of a revealed number that has as many flags around it.
+        getNeighbours(row, col):
+            Returns the coordinates of the neighbours of the block inside the board.
+        isRevealed(row, col):
+            Checks if the block at the given coordinates is revealed.
+        isFlagged(row, col):
+            Checks if the block at the given coordinates is flagged.
+        getNumber(row, col):
+            Returns the number of the revealed block, None if the block is not revealed.
+        getSize():
+            Returns the size of the board.
+        getMines():
+            Returns the number of mines on the board.
+        getFlagsLeft():
+            Returns the number of mines minus the number of flags.
+        isWon():
+            Checks if every block without a mine is revealed.
+        isLost():
+            Checks if a mine has been revealed.
+        isOver():
+            Checks if the game is won or lost.
+    """
+    def __init__(self, board):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            board : Board
+                the board the game is played on, the flags already placed on it are counted
+        """
+        self.board = board
+        self.flags = board.state.count(FLAGGED)
+
+    @classmethod
+    def new(cls, size, mines, deferred=False):
+        """
+        Returns an engine playing on a new board.
+
+        Parameters
+        ----------
+            size : (int, int)
+                width and height of the board
+            mines : int
+                number of mines, 0 for the number of mines of the size
+            deferred : bool
+                represents if the mines are placed on the first reveal, away from it
+
+        Return
+        ------
+            engine : Engine
+        """
+        return cls(Board(size, mines, deferred))
+
+    def getPosition(self, row, col):
+        """Returns the position of the block in the flat buffers, raising IndexError outside the board."""
+        if self.board.outOfBounds((row, col)):
+            raise IndexError("({}, {}) is outside the board".format(row, col))
+        return self.board.toPosition((row, col))
+
+    def reveal(self, row, col):
+        """
+        Reveals the block at the given coordinates, and the empty region around it.
+
+        Parameters
+        ----------
+            row : int
+            col : int
+
+        Return
+        ------
+            revealed : list[(int, int)]
+                coordinates of the newly revealed blocks, empty if the game is over
+        """
+        position = self.getPosition(row, col)
+        if self.isOver():
+            return []
+        toIndex = self.board.toIndex
+        return [toIndex(revealed) for revealed in self.board.reveal(position)]
+
+    def flag(self, row, col):
+        """
+        Flips the flag of the block at the given coordinates.
+
+        Parameters
+        ----------
+            row : int
+            col : int
+
+        Return
+        ------
+            True if the block is flagged afterwards
+        """
+        position = self.getPosition(row, col)
+        if not self.isOver():
+            self.flags -= self.board.toggleFlag(position)
+        return self.board.state[position] == FLAGGED
+
+    def chord(self, row, col):
+        """
+        Reveals the unflagged neighbours of a revealed number that has as many flags around it.
+
+        Parameters
+        ----------
+            row : int
+            col : int
+
+        Return
+        ------
+            revealed : list[(int, int)]
+                coordinates of the newly revealed blocks
+        """
+        position = self.getPosition(row, col)
+        if self.isOver():
+            return []
+        toIndex = self.board.toIndex
+        return [toIndex(revealed) for revealed in self.board.chord(position)]
+
+    def getNeighbours(self, row, col):
+        """
+        Returns the coordinates of the neighbours of the block inside the board.
+
+        Return
+        ------
+            neighbours : list[(int, int)]
+        """
+        neighbours = []
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                if (i or j) and not self.board.outOfBounds((row + i, col + j)):
+                    neighbours.append((row + i, col + j))
+        return neighbours
+
+    def isRevealed(self, row, col):
+        """Checks if the block at the given coordinates is revealed."""
+        return self.board.state[self.getPosition(row, col)] == CLICKED
+
+    def isFlagged(self, row, col):
+        """Checks if the block at the given coordinates is flagged."""
+        return self.board.state[self.getPosition(row, col)] == FLAGGED
+
+    def getNumber(self, row, col):
+        """
+        Returns the number of mines around the revealed block, None if the block is not revealed.
+
+        Return
+        ------
+            number : int or None
+        """
+        position = self.getPosition(row, col)
+        if self.board.state[position] != CLICKED:
+            return None
+        return self.board.numbers[position]
+
+    def getSize(self):
+        """Returns the size of the board."""
+        return self.board.getSize()
+
+    def getMines(self):
+        """Returns the number of mines on the board."""
+        return self.board.getNoBombs()
+
+    def getFlagsLeft(self):
+        """Returns the number of mines minus the number of flags, as shown in the header."""
+        return self.board.getNoBombs() - self.flags
+
+    def isWon(self):
+        """Checks if every block without a mine is revealed."""
+        return not self.board.getLost() and self.board.getWon()
+
+    def isLost(self):
+        """Checks if a mine has been revealed."""
+        return self.board.getLost()
+
+    def isOver(self):
+        """Checks if the game is won or lost."""
+        return self.board.getLost() or self.board.getWon()
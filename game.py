@@ -1,8 +1,18 @@
 import pygame
 import os
-from time import sleep
-from multiprocessing import Process
-from multiprocessing.sharedctypes import Value
+from textcache import TextCache
+from atlas import loadAtlas
+from engine import Engine
+from piece import HIDDEN
+from probability import Probabilities
+from boardid import getBoardId
+from savefile import saveGame, loadGame, dumpBoard
+from replay import MoveLog, applyMove, LEFT, MIDDLE, RIGHT
+from math import ceil
+from time import monotonic
+from threading import Thread
+from timer import Timer
+from pool import BoardPool
 
 
 def setcwd():
@@ -12,23 +22,6 @@ def setcwd():
     os.chdir(dirname)
 
 
-def runTimer(seconds):
-    """
-    Represents the timer function
-
-    Parameters
-    ----------
-        seconds : multiprocessing.ctype
-            represents the number of seconds for the timer to count down
-    """
-    finished = False
-    while not finished:
-        seconds.value -= 1
-        sleep(1)
-        if seconds.value <= 0:
-            finished = not finished
-
-
 class Game:
     """
     A class used to represent the game of Minesweeper.
@@ -46,6 +39,8 @@ class Game:
             Contains the assets for the game
         board : Board
             object representing the game board
+        engine : Engine
+            plays the game on the board, the game only renders it and forwards the clicks
         screenSize : (int, int)
             width and height of the window
         offset : int
@@ -56,64 +51,145 @@ class Game:
             the second element represents the number of seconds
         seconds : int
             the number of seconds for the timer
-        sharedSeconds : multiprocessing.ctype
-            the number of seconds for the timer
-            this attribute is shared between the main process and the timer process
-        timer : multiprocessing.Process
-            the process handling the timer
+        timer : Timer
+            the countdown of the game, None if the game is not timed
         rects : list
             contains the rectangles in the header
+        boardSurface : pygame.Surface
+            persistent layer holding the drawn blocks of the board
+        redrawAll : bool
+            represents if the whole window has to be drawn on the next frame
+        headerState : (int, int)
+            the number of flags and seconds last drawn in the header
+        probabilities : Probabilities
+            computes the mine probabilities shown by the heat map, None while the heat map is hidden
+        heatImages : list
+            translucent red blocks drawn over the board by the heat map, one per tenth of probability
         running : bool
-            the game loop condition
+            the game loop condition, the session goes on to the next game if retry is set
+        fps : int
+            frames drawn per second at most, 0 for no limit
         retry : bool
             represents if the user wants to reset the board
-        retry2 : bool
-            represents a check to not reinitialise the timer
         flags : int
             represents the number of bombs shown in the header
         font : str
             the location of the font used to write text
+        text : TextCache
+            the loaded fonts and the rendered header texts
         firstClick : bool
             tracks whether the first click has been made or not
+        savePath : str
+            the file the game is saved to and loaded from by the header buttons
+        log : MoveLog
+            the moves of the current game
+        logPath : str
+            the file the moves of the last game are written to
+        replayLog : MoveLog
+            the moves played back in real time instead of the clicks of the user, None if the game is played
+        startTime : float
+            the monotonic time the current game started at, the moves are timed from it
+        pool : BoardPool
+            boards like the current one allocated or reset in the background, taken on retry
+        placement : threading.Thread
+            places the mines of a deferred board on its first reveal, off the render thread, None when
+            no placement is running
+        pendingMove : (int, int)
+            coordinates of the first reveal, played once the placement is over
+        sounds : dict
+            key : str
+                win or lose
+            value : pygame.mixer.Sound
+            the sounds of the end of the game, loaded once
+        endTime : float
+            the monotonic time the game ended at, None while it is played
+        endDelay : float
+            seconds the end of the game is shown before the window is closed
+        mineDelay : float
+            seconds taken to reveal the mines of a lost game
+        hiddenMines : list[int]
+            positions of the mines left hidden when the game was lost, revealed one after the other
+        minesShown : int
+            number of the hidden mines drawn so far
 
         Methods
         -------
             run():
-                Represents the game loop.
+                Represents the session loop.
+            startSession():
+                Opens the window and starts the first game.
+            endSession():
+                Stops the pool of boards and closes the window.
+            startGame():
+                Starts timing and recording the game of the current board.
+            step():
+                Processes the events and draws one frame.
+            nextGame():
+                Starts a new game on a board from the pool.
             draw():
-                Draws the board and the header.
+                Draws the blocks and the header elements that changed since the last frame.
+            toggleHeatMap():
+                Shows or hides the probability of every unknown block to hold a mine.
+            drawHeatMap():
+                Draws the board layer and the probability of every unknown block over it.
+            getHeatImage(level):
+                Returns the translucent red block for the given tenth of probability.
+            drawPiece(position):
+                Draws the block at the given position on the board layer and returns its rectangle.
             loadImages():
                 Loads the image assets and fills the image dictionary.
             setPieceSize(screenSize, boardSize):
                 Determines the size of the blocks relative to the window and board sizes.
             getImage(piece):
                 Retrieves the image corresponding to the given piece relative to its state.
-            handleClick(position, rightClick):
-                Processes the click interaction from the user and whether that was a right click or not.
+            handleClick(position, rightClick, middleClick):
+                Processes the click interaction from the user and which button was used.
+            createPool():
+                Starts generating boards like the current one in the background.
+            play(index, button):
+                Plays and records a move on the board.
+            finishPlacement():
+                Plays the first reveal once the mines are placed.
+            drawPending():
+                Draws the header and a notice over the board while the mines are placed.
+            playReplay():
+                Plays the moves of the replayed log whose time has come.
             indexOutOfBounds(index):
                 Checks if a given index is outside of the board.
             loadHeaderImages():
                 Loads the header assets and fills the header image dictionary.
             drawHeader():
                 Draws the header on the window.
+            getHeaderState():
+                Returns the values shown in the header.
             getRects():
                 Sets the header rectangles up.
             handleHeaderClick(position):
                 Processes the click interaction on the header from the user and sets specific flags.
-            drawBoard():
-                Draws the board after the user clicks on a mine.
+            save():
+                Saves the board and the time of the game.
+            load():
+                Replaces the game with the saved one.
+            loadSounds():
+                Loads the sounds of the end of the game.
+            endGame():
+                Starts the end of the game.
+            drawEnd():
+                Draws the next frame of the end of the game.
+            drawMine(position):
+                Draws a hidden mine on the board layer and returns its rectangle.
             drawFlags():
                 Draws the number of unflagged mines left.
             drawTime():
                 Draws the seconds from the timer.
             setupTimer():
-                Initialises the shared variable and creates the timer process.
+                Creates the countdown of the game.
             startTimer():
-                Starts the timer process.
+                Starts the countdown.
             checkTimer():
                 Checks if the given seconds have been elapsed.
     """
-    def __init__(self, board, screenSize, offset, timed):
+    def __init__(self, board, screenSize, offset, timed, replayLog=None):
         """
         Initialises the necessary attributes. Updates the working directory. Loads necessary assets.
 
@@ -128,25 +204,48 @@ class Game:
             timed : [bool, int]
                 the first value represents if the game will have a timer
                 the second value represents the seconds
+            replayLog : MoveLog
+                moves played back in real time on the board, which must be built from the id of the log
         """
         self.pieceSize = None
         self.screen = None
         self.images = None
         self.headerImages = {}
         self.board = board
+        self.engine = Engine(board)
         self.screenSize = screenSize
         self.offset = offset
         self.timed = timed
         self.seconds = timed[1]
-        self.sharedSeconds = None
         self.timer = self.setupTimer() if timed[0] else None
         self.rects = []
+        self.boardSurface = None
+        self.redrawAll = True
+        self.headerState = None
+        self.probabilities = None
+        self.heatImages = []
         self.running = True
         self.retry = False
-        self.retry2 = False
+        self.fps = 60
         self.flags = board.getNoBombs()
         self.font = "font\\mine-sweeper.ttf"
+        self.text = TextCache(self.font)
         self.firstClick = False
+        self.savePath = "save.msw"
+        self.log = None
+        self.logPath = "last-game.msr"
+        self.replayLog = replayLog
+        self.startTime = None
+        self.pool = None
+        self.createPool()
+        self.placement = None
+        self.pendingMove = None
+        self.sounds = {}
+        self.endTime = None
+        self.endDelay = 3
+        self.mineDelay = 1
+        self.hiddenMines = []
+        self.minesShown = 0
         self.setPieceSize((self.screenSize[0], self.screenSize[1] - self.offset), self.board.getSize())
         setcwd()
         self.loadImages()
@@ -155,76 +254,230 @@ class Game:
 
         pygame.init()
         pygame.display.set_caption('Minesweeper')
+        self.loadSounds()
+
+    def setCaption(self):
+        """Shows the id of the board in the title of the window, so the board can be shared and replayed."""
+        pygame.display.set_caption('Minesweeper - ' + getBoardId(self.board))
 
     def run(self):
-        """Represents the main game loop."""
+        """Represents the session loop: plays games on the same window until the user exits."""
+        self.startSession()
+        frameRate = pygame.time.Clock()
+        while self.step():
+            frameRate.tick(self.fps)
+        self.endSession()
+
+    def startSession(self):
+        """Opens the window, once for the whole session, and starts the first game."""
         self.screen = pygame.display.set_mode(self.screenSize)
+        self.startGame()
+
+    def endSession(self):
+        """Stops the pool of boards and closes the window."""
+        self.pool.close()
+        pygame.quit()
+
+    def startGame(self):
+        """Starts timing and recording the game of the current board, reusing the board layer if it has the right size."""
+        self.setCaption()
+        # a replayed resumed game starts from the saved board, so its new log does too
+        snapshot = self.replayLog.snapshot if self.replayLog is not None else None
+        self.log = MoveLog(getBoardId(self.board), snapshot=snapshot)
+        self.startTime = monotonic()
+        boardSize = self.board.getSize()
+        surfaceSize = boardSize[1] * self.pieceSize[0], boardSize[0] * self.pieceSize[1]
+        if self.boardSurface is None or self.boardSurface.get_size() != surfaceSize:
+            self.boardSurface = pygame.Surface(surfaceSize)
+        self.redrawAll = True
+        self.endTime = None
+        self.hiddenMines = []
+        self.minesShown = 0
         self.running = True
-        frameRate = pygame.time.Clock()
-        FPS = 60
-        while self.running:
-            frameRate.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    position = pygame.mouse.get_pos()
-                    rightClick = pygame.mouse.get_pressed()[2]
-                    self.handleClick(position, rightClick)
+
+    def step(self):
+        """
+        Processes the events and draws one frame of the game. When the game is over, writes its moves
+        and starts the next game if the user asked for a retry.
+
+        Return
+        ------
+            False once the user has left the session
+        """
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+                self.retry = False
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+                pressed = pygame.mouse.get_pressed()
+                # the middle button, or both buttons pressed together, chords
+                middleClick = event.button == 2 or (pressed[0] and pressed[2])
+                self.handleClick(event.pos, event.button == 3 and not middleClick, middleClick)
+            # the board belongs to the placement thread until its mines are placed
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_h and self.placement is None:
+                self.toggleHeatMap()
+        if self.placement is not None and not self.placement.is_alive():
+            self.finishPlacement()
+        if self.replayLog is not None and self.placement is None:
+            self.playReplay()
+        if self.placement is not None:
+            self.drawPending()
+        else:
             self.draw()
-            pygame.display.flip()
             if self.timed[0] and self.checkTimer():
                 self.board.setLost(True)
-            if self.board.getWon():
-                sound = pygame.mixer.Sound("sound\\win.mp3")
-                sound.play()
-                sleep(3)
-                self.running = False
-                if not isinstance(self.timer, type(None)):
-                    self.timer.terminate()
-            if self.board.getLost():
-                self.drawBoard()
-                pygame.display.flip()
-                sound = pygame.mixer.Sound("sound\\lose.mp3")
-                sound.play()
-                sleep(3)
-                self.running = False
-                if not isinstance(self.timer, type(None)):
-                    self.timer.terminate()
-        if self.retry:
-            self.board.__init__(self.board.getSize(), self.board.getNoBombs())
-            self.retry = False
-            self.retry2 = True
-            self.flags = self.board.getNoBombs()
-            self.timed[1] = self.seconds
-            if self.timed[0]:
-                self.sharedSeconds.value = self.timed[1]
-            self.firstClick = False
-            self.run()
-        pygame.quit()
+            if self.endTime is None and self.engine.isOver():
+                self.endGame()
+            if self.endTime is not None:
+                self.drawEnd()
+        if self.running:
+            return True
+        if self.retry and self.placement is not None:
+            # the board is still used by the placement thread, so the retry waits for the placement
+            return True
+        self.log.save(self.logPath)
+        if not self.retry:
+            return False
+        self.nextGame()
+        return True
+
+    def nextGame(self):
+        """Swaps in a new board from the pool, hands the previous one back to be reset, and starts the game."""
+        self.replayLog = None
+        previous = self.board
+        self.board = self.pool.get()
+        self.engine = Engine(self.board)
+        if self.probabilities is not None:
+            self.probabilities = Probabilities(self.board)
+        self.pool.recycle(previous)
+        self.retry = False
+        self.flags = self.board.getNoBombs()
+        self.timed[1] = self.seconds
+        if self.timed[0]:
+            self.timer.reset(self.timed[1])
+        self.firstClick = False
+        self.startGame()
+
+    def createPool(self):
+        """
+        Starts generating boards of the type, size and number of mines of the current board in the
+        background, for the retries, and stops the previous pool.
+        """
+        if self.pool is not None:
+            self.pool.close()
+        board = self.board
+        boardType = type(board)
+        size = board.getSize()
+        mines = board.getNoBombs()
+        safeArea = board.safeArea
+        # the mines of the new boards are placed on their first reveal, like on the boards of the menu
+        self.pool = BoardPool(lambda: boardType(size, mines, True, safeArea))
 
     def draw(self):
-        """Draws the board and the header."""
-        topLeft = (0, self.offset)
-        for row in range(self.board.getSize()[0]):
-            for col in range(self.board.getSize()[1]):
-                piece = self.board.getPiece((row, col))
-                image = self.getImage(piece)
-                self.screen.blit(image, topLeft)
-                topLeft = topLeft[0] + self.pieceSize[0], topLeft[1]
-            topLeft = 0, topLeft[1] + self.pieceSize[1]
-
-        self.drawHeader()
+        """
+        Draws the blocks and the header elements that changed since the last frame.
+
+        The blocks are kept on a persistent layer, only the blocks reported by the board as changed are
+        drawn again and only their rectangles are updated on the display.
+        """
+        changed = self.board.popChanged()
+        heatMap = self.probabilities is not None and not self.engine.isOver()
+        if heatMap:
+            self.probabilities.update(changed)
+        if self.redrawAll:
+            self.redrawAll = False
+            self.headerState = None
+            size = self.board.getSize()
+            for row in range(size[0]):
+                for col in range(size[1]):
+                    self.drawPiece(self.board.toPosition((row, col)))
+            for position in self.hiddenMines[:self.minesShown]:
+                self.drawMine(position)
+            self.screen.blit(self.boardSurface, (0, self.offset))
+            if heatMap:
+                self.drawHeatMap()
+            self.drawHeader()
+            pygame.display.flip()
+            return
+
+        rects = []
+        for position in changed:
+            rect = self.drawPiece(position)
+            self.screen.blit(self.boardSurface, (rect.x, rect.y + self.offset), rect)
+            rects.append(rect.move(0, self.offset))
+        if heatMap and changed:
+            rects = [self.drawHeatMap()]
+        if self.headerState != self.getHeaderState():
+            rects.append(self.drawHeader())
+        if rects:
+            pygame.display.update(rects)
+
+    def toggleHeatMap(self):
+        """Shows or hides the probability of every unknown block to hold a mine."""
+        if self.probabilities is None:
+            self.probabilities = Probabilities(self.board)
+        else:
+            self.probabilities = None
+        self.redrawAll = True
+
+    def drawHeatMap(self):
+        """
+        Draws the board layer on the window and, over every unknown block, a red shade as strong as
+        the probability of the block to hold a mine.
+
+        Return
+        ------
+            rect : pygame.Rect
+                the area of the window covered by the board
+        """
+        rect = self.screen.blit(self.boardSurface, (0, self.offset))
+        for position, probability in self.probabilities.compute().items():
+            index = self.board.toIndex(position)
+            topLeft = index[1] * self.pieceSize[0], index[0] * self.pieceSize[1] + self.offset
+            self.screen.blit(self.getHeatImage(round(probability * 10)), topLeft)
+        return rect
+
+    def getHeatImage(self, level):
+        """
+        Returns the translucent red block drawn over the blocks whose probability rounds to the given tenth.
+
+        Parameters
+        ----------
+            level : int
+                the probability in tenths, between 0 and 10
+
+        Return
+        ------
+            image : pygame.Surface
+        """
+        if not self.heatImages:
+            for i in range(11):
+                image = pygame.Surface(self.pieceSize, pygame.SRCALPHA)
+                image.fill((255, 0, 0, 20 * i))
+                self.heatImages.append(image)
+        return self.heatImages[level]
+
+    def drawPiece(self, position):
+        """
+        Draws the block at the given position on the board layer and returns its rectangle on the layer.
+
+        Parameters
+        ----------
+            position : int
+                position of the block in the flat buffers of the board
+
+        Return
+        ------
+            rect : pygame.Rect
+        """
+        index = self.board.toIndex(position)
+        topLeft = index[1] * self.pieceSize[0], index[0] * self.pieceSize[1]
+        image = self.getImage(self.board.getPiece(index))
+        return self.boardSurface.blit(image, topLeft)
 
     def loadImages(self):
-        """Loads the board asserts and fills the board image dictionary."""
-        self.images = {}
-        for fileName in os.listdir("assets\\game"):
-            if not fileName.endswith(".png"):
-                continue
-            image = pygame.image.load(r"assets\\game\\" + fileName)
-            image = pygame.transform.scale(image, self.pieceSize)
-            self.images[fileName.split(".")[0]] = image
+        """Loads the board assets from the cached atlas of the piece size and fills the board image dictionary."""
+        self.images = loadAtlas(os.path.join("assets", "game"), self.pieceSize)
 
     def setPieceSize(self, screenSize, boardSize):
         """
@@ -269,9 +522,9 @@ class Game:
                 string = "normal-block"
         return self.images[string]
 
-    def handleClick(self, position, rightClick):
+    def handleClick(self, position, rightClick, middleClick=False):
         """
-        Processes the click interaction from the user and whether that was a right click or not.
+        Processes the click interaction from the user and which button was used.
 
         Parameters
         ----------
@@ -279,21 +532,89 @@ class Game:
                 coordinates of where the user clicked on the window
             rightClick : bool
                 represents whether the click was a right click or not
+            middleClick : bool
+                represents whether the click was a chord, with the middle button or both buttons
         """
-        if self.board.getLost():
-            return
         index = (position[1] - self.offset) // self.pieceSize[1], position[0] // self.pieceSize[0]
         if self.indexOutOfBounds(index):
             self.handleHeaderClick(position)
             return
+        if self.replayLog is not None or self.placement is not None or self.engine.isOver():
+            return
+
+        if middleClick:
+            self.play(index, MIDDLE)
+        else:
+            self.play(index, RIGHT if rightClick else LEFT)
+
+    def play(self, index, button):
+        """
+        Plays a move on the board and records it in the move log.
+
+        The first reveal of a deferred board places its mines, which takes long on large boards and
+        on boards without guesses, so the mines are placed on a thread and the reveal is played by
+        finishPlacement once they are, the frames going on meanwhile. The countdown does not run
+        during the placement.
 
+        Parameters
+        ----------
+            index : (int, int)
+                coordinates of the block
+            button : int
+                LEFT reveals the block, RIGHT flips its flag and MIDDLE chords around it
+        """
+        board = self.board
+        placing = button == LEFT and board.deferred and board.state[board.toPosition(index)] == HIDDEN
         if not self.firstClick:
             self.firstClick = True
-            if not self.retry2 and self.timed[0]:
-                self.startTimer(self.timer)
+            if self.timed[0] and not placing:
+                self.startTimer()
+
+        self.log.append(index[0], index[1], button, int((monotonic() - self.startTime) * 1000))
+        if placing:
+            if self.timed[0]:
+                # started by an earlier flag, the countdown resumes once the mines are placed
+                self.timer.pause()
+            self.pendingMove = index
+            self.placement = Thread(target=board.place, args=(index,), daemon=True)
+            self.placement.start()
+            return
+        applyMove(self.engine, index[0], index[1], button)
+        self.flags = self.engine.getFlagsLeft()
 
-        piece = self.board.getPiece(index)
-        self.flags += self.board.handleClick(piece, index, rightClick)
+    def finishPlacement(self):
+        """Plays the first reveal once the mines are placed, starts the countdown and redraws the board under the notice."""
+        self.placement.join()
+        self.placement = None
+        if self.timed[0]:
+            self.startTimer()
+        applyMove(self.engine, self.pendingMove[0], self.pendingMove[1], LEFT)
+        self.pendingMove = None
+        # the id of a deferred board is only complete once the first click is known
+        self.setCaption()
+        self.flags = self.engine.getFlagsLeft()
+        self.redrawAll = True
+
+    def drawPending(self):
+        """Draws the header and a notice over the board while the mines are placed, without reading the board."""
+        text = self.text.render("PLACING MINES", 20, (255, 0, 0))
+        center = self.boardSurface.get_width() // 2, self.offset + self.boardSurface.get_height() // 2
+        rect = text.get_rect(center=center)
+        # the notice is drawn over the board layer every frame, so its antialiased edges do not pile up
+        self.screen.blit(self.boardSurface, rect, rect.move(0, -self.offset))
+        rects = [self.screen.blit(text, rect)]
+        if self.headerState != self.getHeaderState():
+            rects.append(self.drawHeader())
+        pygame.display.update(rects)
+
+    def playReplay(self):
+        """Plays the moves of the replayed log whose time since the start of the game has come."""
+        now = int((monotonic() - self.startTime) * 1000)
+        while len(self.log) < len(self.replayLog) and not self.engine.isOver() and self.placement is None:
+            row, col, button, time = self.replayLog.getMove(len(self.log))
+            if time > now:
+                break
+            self.play((row, col), button)
 
     def indexOutOfBounds(self, index):
         """
@@ -329,9 +650,17 @@ class Game:
         self.headerImages["retry"] = pygame.transform.scale(self.headerImages["retry"], (50, 50))
 
     def drawHeader(self):
-        """Draws the header on the window."""
+        """
+        Draws the header on the window.
+
+        Return
+        ------
+            rect : pygame.Rect
+                the area of the window covered by the header
+        """
+        self.headerState = self.getHeaderState()
         topLeft = (0, 0)
-        self.screen.blit(self.headerImages["header"], topLeft)
+        rect = self.screen.blit(self.headerImages["header"], topLeft)
 
         topLeft = (100, 25)
         self.screen.blit(self.headerImages["bg-block"], topLeft)
@@ -345,8 +674,24 @@ class Game:
         topLeft = (550, 25)
         self.screen.blit(self.headerImages["exit"], topLeft)
 
+        for rect, label in zip(self.rects[2:], ("SAVE", "LOAD")):
+            self.screen.blit(self.headerImages["bg-block"], rect.topleft)
+            text = self.text.render(label, 20, (255, 0, 0))
+            self.screen.blit(text, text.get_rect(center=rect.center))
+
         self.drawFlags()
         self.drawTime()
+        return rect
+
+    def getHeaderState(self):
+        """
+        Returns the values shown in the header.
+
+        Return
+        ------
+            (flags, seconds) : (int, int)
+        """
+        return self.flags, self.timer.getSeconds() if self.timed[0] else 0
 
     def getRects(self):
         """Sets the header rectangles up."""
@@ -356,6 +701,12 @@ class Game:
         timer = pygame.Rect(800, 25, 100, 50)
         self.rects.append(timer)
 
+        save = pygame.Rect(250, 25, 100, 50)
+        self.rects.append(save)
+
+        load = pygame.Rect(650, 25, 100, 50)
+        self.rects.append(load)
+
     def handleHeaderClick(self, position):
         """
         Processes the click interaction on the header from the user and sets specific flags.
@@ -366,6 +717,9 @@ class Game:
                 coordinates of where the user clicked on the window
         """
         index = position[0] // 50, position[1] // 25
+        # the board belongs to the placement thread until its mines are placed, so it cannot be saved
+        # or replaced meanwhile, a retry waits for the placement and an exit does not
+        placing = self.placement is not None
         if index[0] == 8:
             if 1 <= index[1] <= 2:
                 self.retry = True
@@ -373,22 +727,126 @@ class Game:
         elif index[0] == 11:
             if 1 <= index[1] <= 2:
                 self.running = False
+                self.retry = False
+        elif 5 <= index[0] <= 6:
+            if 1 <= index[1] <= 2 and not placing:
+                self.save()
+        elif 13 <= index[0] <= 14:
+            if 1 <= index[1] <= 2 and not placing:
+                self.load()
+
+    def save(self):
+        """Saves the board and the time of the game to the save file, if the board fits in the format."""
+        elapsed = self.timer.getElapsed() if self.timer is not None else 0.0
+        try:
+            saveGame(self.savePath, self.board, elapsed, self.seconds if self.timed[0] else 0)
+        except (OSError, ValueError):
+            return
+
+    def load(self):
+        """Replaces the game with the one in the save file, if there is one, and resumes its timer."""
+        try:
+            board, elapsed, seconds = loadGame(self.savePath)
+        except (OSError, ValueError):
+            return
+        self.board = board
+        self.engine = Engine(board)
+        # the saved board already has moves played on it, so the log starts from it rather than from its id
+        self.log = MoveLog(getBoardId(board), snapshot=dumpBoard(board))
+        self.startTime = monotonic()
+        self.replayLog = None
+        self.createPool()
+        self.endTime = None
+        self.hiddenMines = []
+        self.minesShown = 0
+        if self.probabilities is not None:
+            self.probabilities = Probabilities(board)
+        self.flags = self.engine.getFlagsLeft()
+        self.timed = [seconds > 0, seconds]
+        self.seconds = seconds
+        self.timer = self.setupTimer() if self.timed[0] else None
+        self.firstClick = board.clicked > 0 or elapsed > 0
+        if self.timer is not None:
+            self.timer.reset(seconds, elapsed)
+            if self.firstClick:
+                self.startTimer()
+
+        boardSize = board.getSize()
+        self.setPieceSize((self.screenSize[0], self.screenSize[1] - self.offset), boardSize)
+        self.loadImages()
+        self.loadHeaderImages()
+        self.heatImages = []
+        self.boardSurface = pygame.Surface((boardSize[1] * self.pieceSize[0], boardSize[0] * self.pieceSize[1]))
+        self.screen.fill((0, 0, 0))
+        self.redrawAll = True
+        self.setCaption()
+
+    def loadSounds(self):
+        """Loads the sounds of the end of the game once, leaving out the ones that cannot be played."""
+        for name in ("win", "lose"):
+            try:
+                self.sounds[name] = pygame.mixer.Sound(os.path.join("sound", name + ".mp3"))
+            except (pygame.error, OSError):
+                pass
+
+    def endGame(self):
+        """
+        Starts the end of the game: stops the timer, plays the sound of the result and, if the game is
+        lost, lists the mines still hidden so they are revealed over the next frames.
+
+        The board is not changed, the mines are only drawn, from the positions kept by the board.
+        """
+        self.endTime = monotonic()
+        if self.timer is not None:
+            self.timer.pause()
+        sound = self.sounds.get("win" if self.engine.isWon() else "lose")
+        if sound is not None:
+            sound.play()
+        if self.engine.isLost():
+            state = self.board.state
+            self.hiddenMines = [position for position in self.board.getMinePositions() if state[position] == HIDDEN]
+        self.minesShown = 0
+
+    def drawEnd(self):
+        """
+        Draws the next frame of the end of the game, revealing the hidden mines over mineDelay seconds,
+        and closes the game after endDelay seconds. The header stays clickable meanwhile.
+        """
+        elapsed = monotonic() - self.endTime
+        total = len(self.hiddenMines)
+        count = min(total, ceil(total * elapsed / self.mineDelay))
+        if count > self.minesShown:
+            rects = []
+            for position in self.hiddenMines[self.minesShown:count]:
+                rect = self.drawMine(position)
+                self.screen.blit(self.boardSurface, (rect.x, rect.y + self.offset), rect)
+                rects.append(rect.move(0, self.offset))
+            self.minesShown = count
+            pygame.display.update(rects)
+        if elapsed >= self.endDelay:
+            self.running = False
+
+    def drawMine(self, position):
+        """
+        Draws a hidden mine on the board layer and returns its rectangle on the layer.
+
+        Parameters
+        ----------
+            position : int
+                position of the mine in the flat buffers of the board
 
-    def drawBoard(self):
-        """Draws the board after the user clicks on a mine."""
-        for row in range(self.board.getSize()[0]):
-            for col in range(self.board.getSize()[1]):
-                piece = self.board.getPiece((row, col))
-                if not piece.getHasBomb() and piece.getNumber() == 0:
-                    continue
-                piece.setClicked()
-        self.draw()
+        Return
+        ------
+            rect : pygame.Rect
+        """
+        index = self.board.toIndex(position)
+        topLeft = index[1] * self.pieceSize[0], index[0] * self.pieceSize[1]
+        return self.boardSurface.blit(self.images["mine-unclicked-block"], topLeft)
 
     def drawFlags(self):
         """Draws the number of unflagged mines left."""
         RED = (255, 0, 0)
-        font = pygame.font.Font(self.font, 20)
-        text = font.render(str(self.flags), True, RED)
+        text = self.text.render(str(self.flags), 20, RED)
         textRect = text.get_rect()
         textRect.center = self.rects[0].center
 
@@ -397,9 +855,8 @@ class Game:
     def drawTime(self):
         """Draws the seconds from the timer."""
         RED = (255, 0, 0)
-        font = pygame.font.Font(self.font, 20)
-        value = self.sharedSeconds.value if self.timed[0] else 0
-        text = font.render(str(value), True, RED)
+        value = self.timer.getSeconds() if self.timed[0] else 0
+        text = self.text.render(str(value), 20, RED)
         textRect = text.get_rect()
         textRect.center = self.rects[1].center
 
@@ -407,20 +864,18 @@ class Game:
 
     def setupTimer(self):
         """
-        Initialises the shared variable and creates the timer process.
+        Creates the countdown of the game.
 
         Return
         ------
-            p : Process
-                represents the timer process
+            timer : Timer
+                the countdown, started by the first click on the board
         """
-        self.sharedSeconds = Value('i', self.timed[1])
-        p = Process(target=runTimer, args=[self.sharedSeconds])
-        return p
+        return Timer(self.timed[1])
 
-    def startTimer(self, p):
-        """Starts the timer process."""
-        p.start()
+    def startTimer(self):
+        """Starts the countdown."""
+        self.timer.start()
 
     def checkTimer(self):
         """
@@ -428,10 +883,8 @@ class Game:
 
         Return
         ------
-            sharedSeconds.value <= 0
+            True if the countdown is over
         """
         if self.timed[0]:
-            with self.sharedSeconds:
-                if self.sharedSeconds.value <= 0:
-                    return True
+            return self.timer.isFinished()
         return False
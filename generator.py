@@ -0,0 +1,113 @@
+from time import perf_counter
+from board import Board
+from solver import Solver
+
+
+class NoGuessBoard(Board):
+    """
+    A class used to represent a board that can be solved without guessing from its first click.
+
+    When the mines are placed, layouts are generated and played by the solver from the first click
+    until one is won, or until the time budget is spent, in which case the last layout is kept even
+    though it may need a guess. The 3x3 area around the first click is kept free of mines by default,
+    so the first click always opens a region.
+
+    Attributes
+    ----------
+        budget : float
+            seconds spent at most on the placement of the mines
+        stats : dict
+            statistics of the last placement:
+                attempts : number of layouts generated
+                seconds : time spent
+                solvable : whether the layout can be solved without guessing
+
+    Methods
+    -------
+        place(index):
+            Places mines that can be found without guessing from the block at the given coordinates.
+    """
+    def __init__(self, size, custom, deferred=False, safeArea=True, budget=1.0, seed=None):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            size : (int, int)
+                width and height of the board
+            custom : int
+                number of mines, 0 for the number of mines of the size
+            deferred : bool
+                represents if the mines are placed on the first reveal
+            safeArea : bool
+                represents if the whole 3x3 area around the first reveal is kept free of mines
+            budget : float
+                seconds spent at most on the placement of the mines
+            seed : int
+                seed of the layouts, a random one if None
+        """
+        self.budget = budget
+        self.stats = None
+        super().__init__(size, custom, deferred, safeArea, seed)
+
+    def place(self, index=None):
+        """
+        Places mines that can be found without guessing from the block at the given coordinates.
+
+        The state of the board, with the flags placed before the first click, is kept. The layouts are
+        generated in the order given by the seed, so the same seed and first click give the same board,
+        unless the time budget runs out.
+
+        Parameters
+        ----------
+            index : (int, int)
+                coordinates of the first click, the center of the board if None
+        """
+        start = perf_counter()
+        self.deferred = False
+        if index is None:
+            index = self.size[0] // 2, self.size[1] // 2
+        self.firstClick = index
+        self.rng.seed(self.seed)
+        excluded = self.getSafeArea(index)
+        position = self.toPosition(index)
+        saved = bytes(self.state)
+        changed = self.changed
+        attempts = 0
+        while True:
+            attempts += 1
+            self.setBombs(self.numberOfBombs, excluded)
+            solvable = Solver(self).play(position)
+            self.resetState()
+            if solvable or perf_counter() - start >= self.budget:
+                break
+        self.state[:] = saved
+        self.changed = changed
+        self.stats = {"attempts": attempts, "seconds": perf_counter() - start, "solvable": solvable}
+
+
+def generateSolvable(size, mines, index=None, budget=1.0, seed=None):
+    """
+    Generates a board that can be solved without guessing from a first click at the given coordinates.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the board
+        mines : int
+            number of mines, 0 for the number of mines of the size
+        index : (int, int)
+            coordinates of the first click, the center of the board if None
+        budget : float
+            seconds spent at most on the generation
+        seed : int
+            seed of the layouts, a random one if None
+
+    Return
+    ------
+        (board, stats) : (NoGuessBoard, dict)
+            the board, with every block hidden, and the statistics of the generation
+    """
+    board = NoGuessBoard(size, mines, True, budget=budget, seed=seed)
+    board.place(index)
+    return board, board.stats
@@ -1,5 +1,7 @@
 import pygame
 import os
+from textcache import TextCache
+from atlas import loadAtlas
 from time import sleep
 from random import randint
 
@@ -34,16 +36,24 @@ class Menu:
             RGB constant for the color red
         buttonSize : (int, int)
             width and height of the buttons that will be drawn on the main menu
+        eventTimeout : int
+            the milliseconds the menu loops wait for an event before checking their state again
         time : [bool, int]
             first element represents if a timer will be used in the game
             second element represents the number of seconds that the timer will count down
+        noGuess : bool
+            represents if the board of the game must be solvable without guessing
         font : str
             path to the font that will be used for the text
+        text : TextCache
+            the loaded fonts and the rendered texts of the menus
 
     Methods
     -------
         run():
             Represents the main menu loop.
+        waitEvents():
+            Blocks until an event arrives or the timeout passes, then returns all the pending events.
         loadImages():
             Loads the assets for the main menu and sets up the images dictionary.
         draw():
@@ -88,8 +98,11 @@ class Menu:
         self.BLUE = (0, 0, 255)
         self.randomized = [False, False, False]
         self.buttonSize = (200, 100)
+        self.eventTimeout = 500
         self.time = [False, 0]
+        self.noGuess = False
         self.font = "font\\mine-sweeper.ttf"
+        self.text = TextCache(self.font)
         self.loadImages()
         pygame.display.set_caption('Minesweeper')
 
@@ -109,38 +122,49 @@ class Menu:
                     second value represents the number of seconds for the timer
         """
         value = [8, 0, 0, 0, self.time]
+        drawn = None
         while self.running:
-            for event in pygame.event.get():
+            if drawn != (self.time[0], self.noGuess):
+                drawn = (self.time[0], self.noGuess)
+                self.window.fill(self.GREY)
+                self.draw()
+                pygame.display.flip()
+            for event in self.waitEvents():
                 if event.type == pygame.QUIT:
                     self.running = False
                     value[0] = 8
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     position = pygame.mouse.get_pos()
                     value = self.handleClick(position)
-            self.window.fill(self.GREY)
-            self.draw()
-            pygame.display.flip()
+                if event.type == pygame.VIDEOEXPOSE:
+                    drawn = None
         if self.time[0] and value[0] != 8:
             value = self.handleTimedMenu(value)
         pygame.quit()
         return value
 
+    def waitEvents(self):
+        """
+        Blocks until an event arrives or the timeout passes, then returns all the pending events.
+
+        Return
+        ------
+            events : list[pygame.event.Event]
+        """
+        event = pygame.event.wait(self.eventTimeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
     def loadImages(self):
-        """Loads the main menu assets and fills the images dictionary."""
-        for fileName in os.listdir("assets\\menu"):
-            if not fileName.endswith(".png"):
-                continue
-            image = pygame.image.load(r"assets\\menu\\" + fileName)
-            image = pygame.transform.scale(image, self.buttonSize)
-            self.images[fileName.split(".")[0]] = image
+        """Loads the main menu assets, from the cached atlas when possible, and fills the images dictionary."""
+        self.images.update(loadAtlas(os.path.join("assets", "menu"), self.buttonSize))
+        self.images["title-large"] = pygame.transform.scale(self.images["title"], (self.buttonSize[0] * 2, self.buttonSize[1] * 2))
 
     def draw(self):
         """Draws the main menu."""
         topLeft = (400, 50)
-        image = self.images["title"]
-        image = pygame.transform.scale(image, (self.buttonSize[0] * 2, self.buttonSize[1] * 2))
-
-        self.window.blit(image, (topLeft[0] - self.buttonSize[0] // 2, topLeft[1]))
+        self.window.blit(self.images["title-large"], (topLeft[0] - self.buttonSize[0] // 2, topLeft[1]))
 
         topLeft = topLeft[0], topLeft[1] + 250
         self.window.blit(self.images["beginner"], topLeft)
@@ -160,6 +184,15 @@ class Menu:
         topLeft = topLeft[0], topLeft[1] + 110
         self.window.blit(self.images["exit"], topLeft)
 
+        # no guess button
+        rect = pygame.Rect(100, 740, 200, 100)
+        pygame.draw.rect(self.window, (0, 0, 0), rect)
+        text = self.text.render("NO GUESS", 20, self.BLUE if self.noGuess else self.RED)
+        textRect = text.get_rect()
+        textRect.center = rect.center
+
+        self.window.blit(text, textRect)
+
     def handleClick(self, position):
         """
         Processes the click interaction from the user and returns a list of responses.
@@ -182,6 +215,9 @@ class Menu:
         """
         index = position[0] // 100, position[1] // 100
 
+        if 1 <= index[0] < 3 and index[1] == 7:
+            self.noGuess = not self.noGuess
+            return [9, 0, 0, 0, self.time]
         if not (4 <= index[0] < 6):
             return [0, 0, 0, 0, self.time]
         if index[1] == 7:
@@ -226,8 +262,20 @@ class Menu:
         images = self.getCustomImages()
         display = pygame.Surface(self.screenSize)
         quit = False
+        drawn = None
         while running:
-            for event in pygame.event.get():
+            state = (row, col, mines, tuple(self.randomized))
+            if drawn != state:
+                drawn = state
+                self.window.fill(self.GREY)
+                display.fill(self.GREY)
+                # display.blit(self.images["title"], (0, 0))
+                display = self.drawCustomButtons(display, images)
+                display = self.drawRectangles(display, row, col, mines)
+
+                self.window.blit(display, (0, 0))
+                pygame.display.flip()
+            for event in self.waitEvents():
                 if event.type == pygame.QUIT:
                     running = False
                     quit = True
@@ -238,14 +286,8 @@ class Menu:
                     row = value[1]
                     col = value[2]
                     mines = value[3]
-            self.window.fill(self.GREY)
-            display.fill(self.GREY)
-            # display.blit(self.images["title"], (0, 0))
-            display = self.drawCustomButtons(display, images)
-            display = self.drawRectangles(display, row, col, mines)
-
-            self.window.blit(display, (0, 0))
-            pygame.display.flip()
+                if event.type == pygame.VIDEOEXPOSE:
+                    drawn = None
 
         value = [6, row, col, mines, self.time]
         if quit:
@@ -272,7 +314,7 @@ class Menu:
         for i in images.keys():
             images[i] = pygame.transform.scale(images[i], (100, 100))
 
-        images["title"] = pygame.transform.scale(self.images["title"], (self.buttonSize[0] * 2, self.buttonSize[1] * 2))
+        images["title"] = self.images["title-large"]
         images["start"] = self.images["start"]
         images["empty-random"] = self.images["empty-random"]
 
@@ -376,22 +418,21 @@ class Menu:
         pygame.draw.rect(display, (0, 0, 0), rect3)
 
         # rows counter
-        font = pygame.font.Font(self.font, 20)
-        text = font.render(str(row), True, self.RED if not self.randomized[0] else self.BLUE)
+        text = self.text.render(str(row), 20, self.RED if not self.randomized[0] else self.BLUE)
         textRect = text.get_rect()
         textRect.center = rect1.center
 
         display.blit(text, textRect)
 
         # row text
-        text = font.render("ROWS", True, self.RED if not self.randomized[0] else self.BLUE)
+        text = self.text.render("ROWS", 20, self.RED if not self.randomized[0] else self.BLUE)
         textRect = text.get_rect()
         textRect.center = rect1.center[0], rect1.center[1] + 200
 
         display.blit(text, textRect)
 
         # columns counter
-        text = font.render(str(col), True, self.RED if not self.randomized[1] else self.BLUE)
+        text = self.text.render(str(col), 20, self.RED if not self.randomized[1] else self.BLUE)
         textRect = text.get_rect()
         textRect.center = rect2.center
 
@@ -399,14 +440,14 @@ class Menu:
 
         # column text
 
-        text = font.render("COLUMNS", True, self.RED if not self.randomized[1] else self.BLUE)
+        text = self.text.render("COLUMNS", 20, self.RED if not self.randomized[1] else self.BLUE)
         textRect = text.get_rect()
         textRect.center = rect2.center[0], rect2.center[1] + 200
 
         display.blit(text, textRect)
 
         # mines counter
-        text = font.render(str(mines), True, self.RED if not self.randomized[2] else self.BLUE)
+        text = self.text.render(str(mines), 20, self.RED if not self.randomized[2] else self.BLUE)
         textRect = text.get_rect()
         textRect.center = rect3.center
 
@@ -414,7 +455,7 @@ class Menu:
 
         # mine counter
 
-        text = font.render("MINES", True, self.RED if not self.randomized[2] else self.BLUE)
+        text = self.text.render("MINES", 20, self.RED if not self.randomized[2] else self.BLUE)
         textRect = text.get_rect()
         textRect.center = rect3.center[0], rect3.center[1] + 200
 
@@ -424,7 +465,7 @@ class Menu:
 
         rectRandom = pygame.Rect(400, 700, 200, 100)
         # pygame.draw.rect(display, (0, 0, 0), rectRandom)
-        text = font.render("RANDOM", True, self.BLUE)
+        text = self.text.render("RANDOM", 20, self.BLUE)
         textRect = text.get_rect()
         textRect.center = rectRandom.center[0], rectRandom.center[1]
 
@@ -579,8 +620,17 @@ class Menu:
 
         # value = [mode, row, col, mines, [timed, seconds]]
         quit = False
+        drawn = None
         while running:
-            for event in pygame.event.get():
+            if drawn != value[4][1]:
+                drawn = value[4][1]
+                self.window.fill(self.GREY)
+                display.fill(self.GREY)
+                display = self.drawTimeMenu(display, images, value[4][1])
+
+                self.window.blit(display, (0, 0))
+                pygame.display.flip()
+            for event in self.waitEvents():
                 if event.type == pygame.QUIT:
                     running = False
                     quit = True
@@ -589,13 +639,8 @@ class Menu:
                     res = self.handleTimeClick(position, value)
                     running = res[0]
                     value = res[1]
-
-            self.window.fill(self.GREY)
-            display.fill(self.GREY)
-            display = self.drawTimeMenu(display, images, value[4][1])
-
-            self.window.blit(display, (0, 0))
-            pygame.display.flip()
+                if event.type == pygame.VIDEOEXPOSE:
+                    drawn = None
 
         if quit:
             value[0] = 8
@@ -641,15 +686,14 @@ class Menu:
         # seconds
         rect = pygame.Rect(400, 400, 200, 100)
         pygame.draw.rect(display, (0, 0, 0), rect)
-        font = pygame.font.Font(self.font, 20)
-        text = font.render(str(seconds), True, self.RED)
+        text = self.text.render(str(seconds), 20, self.RED)
         textRect = text.get_rect()
         textRect.center = rect.center
 
         display.blit(text, textRect)
 
         # seconds text
-        text = font.render("SECONDS", True, self.RED)
+        text = self.text.render("SECONDS", 20, self.RED)
         textRect = text.get_rect()
         textRect.center = rect.center[0], rect.center[1] + 200
 
@@ -1,7 +1,11 @@
 import sys
+import argparse
 from game import Game
 from board import Board
+from generator import NoGuessBoard
 from menu import Menu
+from boardid import newBoard
+from replay import MoveLog
 
 
 def handleValue(value):
@@ -27,20 +31,42 @@ def handleValue(value):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Minesweeper.")
+    parser.add_argument("--board", metavar="ID", help="id of a board to replay, shown in the title of the window")
+    parser.add_argument("--replay", metavar="LOG", help="move log to play back in real time, like last-game.msr")
+    options = parser.parse_args()
+
     offset = 100
     screenSize = (1000, 1000)
 
-    menu = Menu(screenSize)
-    running = menu.run()
+    replayLog = None
+    if options.replay is not None:
+        replayLog = MoveLog.load(options.replay)
+        options.board = replayLog.boardId
+    if options.board is not None:
+        # the menu is skipped, the board of the id is played without a timer
+        try:
+            # the log of a resumed game starts from its saved board rather than from the board of its id
+            board = replayLog.getStartBoard() if replayLog is not None else newBoard(options.board)
+        except ValueError as error:
+            parser.error(str(error))
+        timed = [False, 0]
+    else:
+        menu = Menu(screenSize)
+        running = menu.run()
 
-    res = handleValue(running)
+        res = handleValue(running)
 
-    size = res[0], res[1]
-    mines = res[2]
-    timed = res[3]
+        size = res[0], res[1]
+        mines = res[2]
+        timed = res[3]
 
-    boardSize = size
+        boardSize = size
 
-    board = Board(boardSize, mines)
-    game = Game(board, screenSize, offset, timed)
+        # the mines are placed on the first reveal, so the first click is never a mine
+        if menu.noGuess:
+            board = NoGuessBoard(boardSize, mines, True)
+        else:
+            board = Board(boardSize, mines, True)
+    game = Game(board, screenSize, offset, timed, replayLog)
     game.run()
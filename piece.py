@@ -1,17 +1,22 @@
+HIDDEN = 0
+CLICKED = 1
+FLAGGED = 2
+BORDER = 3
+
+
 class Piece:
     """
-    A class used to represent a block on the board and to keep information about respective block.
+    A class used to represent a block on the board and to access the information about respective block.
+
+    The state of the block is not kept by the piece itself, it is stored in the flat buffers of the board.
+    A piece is only a lightweight view over one position of those buffers.
 
     Attributes
     ----------
-        hasBomb : bool
-            flag if block is a mine
-        clicked : bool
-            flag if block has been clicked
-        flagged : bool
-            flag if block has been flagged by the user
-        number : int
-            number of mines around piece if not mine
+        board : Board
+            the board the piece belongs to
+        position : int
+            index of the block in the flat buffers of the board
 
     Methods
     -------
@@ -30,44 +35,47 @@ class Piece:
         setClicked():
             Sets the flag clicked to True.
     """
-    def __init__(self, hasBomb):
+    __slots__ = ("board", "position")
+
+    def __init__(self, board, position):
         """
         Initialises the necessary attributes.
 
         Parameters
         ----------
-            hasBomb : bool
-                flag if the piece is a mine
+            board : Board
+                the board the piece belongs to
+            position : int
+                index of the block in the flat buffers of the board
         """
-        self.hasBomb = hasBomb
-        self.clicked = False
-        self.flagged = False
-        self.number = 0
+        self.board = board
+        self.position = position
 
     def getHasBomb(self):
         """Returns the flag hasBomb."""
-        return self.hasBomb
+        return self.board.mines[self.position] == 1
 
     def getClicked(self):
         """Returns the flag clicked."""
-        return self.clicked
+        return self.board.state[self.position] == CLICKED
 
     def getFlagged(self):
         """Returns the flag flagged."""
-        return self.flagged
+        return self.board.state[self.position] == FLAGGED
 
     def setNumber(self, number):
         """Sets a new value up for number."""
-        self.number = number
+        self.board.numbers[self.position] = number
 
     def getNumber(self):
         """Returns the attribute number."""
-        return self.number
+        return self.board.numbers[self.position]
 
     def setFlag(self):
         """Flips the flag flagged."""
-        self.flagged = not self.flagged
+        state = self.board.state
+        state[self.position] = HIDDEN if state[self.position] == FLAGGED else FLAGGED
 
     def setClicked(self):
         """Sets the flag clicked to True."""
-        self.clicked = True
+        self.board.state[self.position] = CLICKED
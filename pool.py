@@ -0,0 +1,99 @@
+from queue import Queue, Empty, Full
+from threading import Thread, Event
+
+
+class BoardPool:
+    """
+    A class used to keep a few boards generated ahead of time by a background thread.
+
+    The thread builds boards with the factory until the pool is full, and builds a new one as soon
+    as a board is taken, so taking a board does not wait for its allocation unless the pool is empty.
+    The boards handed back once their game is over are reset in place and used again before any new
+    board is built, so a long session keeps reusing the same buffers. The mines of deferred boards
+    depend on the first click, so they are placed by the game on its own thread, not by the pool.
+
+    Attributes
+    ----------
+        factory : callable
+            returns a new board
+        boards : queue.Queue
+            the boards ready to be taken
+        recycled : queue.Queue
+            the boards handed back, to be reset
+        stopped : threading.Event
+            set when the pool is closed
+        thread : threading.Thread
+            the daemon thread filling the pool
+
+    Methods
+    -------
+        get():
+            Returns a new board, from the pool when one is ready.
+        recycle(board):
+            Hands back a board that is no longer used.
+        fill():
+            Keeps the pool full until it is closed.
+        close():
+            Stops the thread filling the pool.
+    """
+    def __init__(self, factory, size=2):
+        """
+        Initialises the necessary attributes and starts filling the pool.
+
+        Parameters
+        ----------
+            factory : callable
+                returns a new board, called from the thread of the pool
+            size : int
+                number of boards kept ready
+        """
+        self.factory = factory
+        self.boards = Queue(maxsize=size)
+        self.recycled = Queue()
+        self.stopped = Event()
+        self.thread = Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def get(self):
+        """
+        Returns a new board, from the pool when one is ready, otherwise built right away.
+
+        Return
+        ------
+            board : Board
+        """
+        try:
+            return self.boards.get_nowait()
+        except Empty:
+            return self.factory()
+
+    def recycle(self, board):
+        """
+        Hands back a board that is no longer used, to be reset in place by the thread of the pool.
+
+        Parameters
+        ----------
+            board : Board
+                a board built by the factory, not referenced anymore by the caller
+        """
+        self.recycled.put(board)
+
+    def fill(self):
+        """Keeps the pool full until it is closed, with the recycled boards first."""
+        while not self.stopped.is_set():
+            try:
+                board = self.recycled.get_nowait()
+                board.reset()
+            except Empty:
+                board = self.factory()
+            while not self.stopped.is_set():
+                try:
+                    # the timeout lets a closed pool stop while it is full
+                    self.boards.put(board, timeout=0.1)
+                    break
+                except Full:
+                    pass
+
+    def close(self):
+        """Stops the thread filling the pool, the boards already in the pool can still be taken."""
+        self.stopped.set()
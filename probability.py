@@ -0,0 +1,145 @@
+from math import comb
+from solver import Solver
+
+
+def convolve(first, second):
+    """
+    Returns the distribution of the sum of two independent numbers of mines.
+
+    Parameters
+    ----------
+        first : dict
+            key : int
+                number of mines
+            value : int
+                number of ways to place them
+        second : dict
+            same as first
+
+    Return
+    ------
+        result : dict
+    """
+    result = {}
+    for a, waysA in first.items():
+        for b, waysB in second.items():
+            result[a + b] = result.get(a + b, 0) + waysA * waysB
+    return result
+
+
+class Probabilities:
+    """
+    A class used to compute the probability of every unknown block of a board to hold a mine.
+
+    The revealed numbers are split into the components of the solver, every component is enumerated
+    (and cached) by the solver, and the components are combined with the number of mines left,
+    weighting every combination by the number of ways to place the remaining mines on the blocks
+    that touch no revealed number.
+
+    Attributes
+    ----------
+        board : Board
+            the board whose probabilities are computed
+        solver : Solver
+            keeps the frontier of the board and the cache of the enumerated components
+
+    Methods
+    -------
+        update(revealed):
+            Updates the frontier after the given blocks have been revealed.
+        compute():
+            Returns the probability of every unknown block to hold a mine.
+    """
+    def __init__(self, board, solver=None):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            board : Board
+                the board whose probabilities are computed
+            solver : Solver
+                a solver of the board to share the frontier and the cache with, a new one if None
+        """
+        self.board = board
+        self.solver = solver if solver is not None else Solver(board)
+
+    def update(self, revealed):
+        """
+        Updates the frontier after the given blocks have been revealed or flagged.
+
+        Parameters
+        ----------
+            revealed : list[int]
+                positions of the changed blocks
+        """
+        self.solver.update(revealed)
+
+    def compute(self):
+        """
+        Returns the probability of every unknown block to hold a mine.
+
+        The blocks of a component too large to be enumerated are counted with the blocks that touch
+        no revealed number, so their probability is approximated by the one of those blocks.
+
+        Return
+        ------
+            probabilities : dict
+                key : int
+                    position of the block in the flat buffers
+                value : float
+        """
+        solver = self.solver
+        constraints = [constraint for constraint in solver.getConstraints() if constraint[0]]
+        components = []
+        frontier = set()
+        for component in solver.getComponents(constraints):
+            cells, result = solver.solveComponent(component)
+            if result:
+                components.append((cells, result))
+                frontier.update(cells)
+        state = self.board.state
+        interior = [position for position in range(len(state)) if solver.isUnknown(position) and position not in frontier]
+        left = self.board.getNoBombs() - len(solver.mines)
+
+        # distribution of the mines of every component but one, from both ends
+        distributions = [{k: entry[0] for k, entry in result.items()} for cells, result in components]
+        prefix = [{0: 1}]
+        for distribution in distributions:
+            prefix.append(convolve(prefix[-1], distribution))
+        suffix = [{0: 1}]
+        for distribution in reversed(distributions):
+            suffix.append(convolve(suffix[-1], distribution))
+        suffix.reverse()
+
+        def interiorWays(mines):
+            if mines < 0 or mines > len(interior):
+                return 0
+            return comb(len(interior), mines)
+
+        total = 0
+        interiorMines = 0
+        for mines, ways in prefix[-1].items():
+            weight = ways * interiorWays(left - mines)
+            total += weight
+            interiorMines += weight * (left - mines)
+        probabilities = {}
+        if total == 0:
+            return probabilities
+
+        for c, (cells, result) in enumerate(components):
+            others = convolve(prefix[c], suffix[c + 1])
+            counts = [0] * len(cells)
+            for k, (ways, cellCounts) in result.items():
+                weight = sum(otherWays * interiorWays(left - k - otherMines) for otherMines, otherWays in others.items())
+                if weight == 0:
+                    continue
+                for i in range(len(cells)):
+                    counts[i] += cellCounts[i] * weight
+            for i, cell in enumerate(cells):
+                probabilities[cell] = counts[i] / total
+        if interior:
+            value = interiorMines / (total * len(interior))
+            for position in interior:
+                probabilities[position] = value
+        return probabilities
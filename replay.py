@@ -0,0 +1,308 @@
+import json
+import argparse
+from struct import Struct
+from engine import Engine
+from boardid import newBoard
+from savefile import dumpBoard, loadBoard
+
+# the mouse buttons of the moves, numbered as by pygame
+LEFT = 1
+MIDDLE = 2
+RIGHT = 3
+
+# row, col, button and milliseconds since the start of the game
+MOVE = Struct("<HHBI")
+MAGIC = b"MSWR"
+# the log of a resumed game, whose header also holds the board it starts from
+RESUMED_MAGIC = b"MSWS"
+SNAPSHOT_SIZE = Struct("<I")
+
+
+class MoveLog:
+    """
+    A class used to record the moves of a game in an append-only compact log.
+
+    Every move takes nine bytes. The log starts from the id of the board, taken before the first click,
+    so the board of a deferred game can be rebuilt and its mines placed by the recorded first click.
+    The log of a game resumed from a save also keeps the saved board, since its first moves were
+    played before the log started.
+
+    Attributes
+    ----------
+        boardId : str
+            the id of the board the moves are played on
+        data : bytearray
+            the packed moves
+        snapshot : bytes
+            the board the moves start from, in the packed format of savefile, None if they start from
+            the board of the id before any click
+
+    Methods
+    -------
+        getStartBoard():
+            Returns a new board in the state the moves start from.
+        append(row, col, button, time):
+            Appends a move at the end of the log.
+        getMove(n):
+            Returns the n-th move.
+        toBytes():
+            Returns the log in its file format.
+        fromBytes(data):
+            Returns the log read from its file format.
+        save(path):
+            Writes the log to a file.
+        load(path):
+            Reads a log from a file.
+    """
+    def __init__(self, boardId, data=b"", snapshot=None):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            boardId : str
+                the id of the board the moves are played on
+            data : bytes
+                packed moves to start from
+            snapshot : bytes
+                the output of dumpBoard for the board the moves start from, None for the board of the id
+        """
+        self.boardId = boardId
+        self.data = bytearray(data)
+        self.snapshot = bytes(snapshot) if snapshot is not None else None
+
+    def __len__(self):
+        return len(self.data) // MOVE.size
+
+    def __iter__(self):
+        return MOVE.iter_unpack(self.data)
+
+    def getStartBoard(self):
+        """
+        Returns a new board in the state the moves start from.
+
+        Return
+        ------
+            board : Board
+        """
+        if self.snapshot is not None:
+            return loadBoard(self.snapshot)[0]
+        return newBoard(self.boardId)
+
+    def append(self, row, col, button, time):
+        """
+        Appends a move at the end of the log.
+
+        Parameters
+        ----------
+            row : int
+            col : int
+            button : int
+                LEFT, MIDDLE or RIGHT
+            time : int
+                milliseconds since the start of the game
+        """
+        self.data += MOVE.pack(row, col, button, time)
+
+    def getMove(self, n):
+        """
+        Returns the n-th move.
+
+        Return
+        ------
+            (row, col, button, time) : (int, int, int, int)
+        """
+        return MOVE.unpack_from(self.data, n * MOVE.size)
+
+    def toBytes(self):
+        """
+        Returns the log in its file format: the magic, the length of the board id, the id and the moves.
+        The log of a resumed game has its own magic, and the length of the snapshot and the snapshot
+        between the id and the moves.
+        """
+        boardId = self.boardId.encode("ascii")
+        if self.snapshot is None:
+            return MAGIC + bytes([len(boardId)]) + boardId + self.data
+        return (RESUMED_MAGIC + bytes([len(boardId)]) + boardId + SNAPSHOT_SIZE.pack(len(self.snapshot))
+                + self.snapshot + self.data)
+
+    @classmethod
+    def fromBytes(cls, data):
+        """
+        Returns the log read from its file format.
+
+        Raises
+        ------
+            ValueError
+                if the data is not a log
+        """
+        view = memoryview(data)
+        magic = bytes(view[:4])
+        if magic not in (MAGIC, RESUMED_MAGIC) or len(view) < 5:
+            raise ValueError("not a move log")
+        end = 5 + view[4]
+        boardId = bytes(view[5:end]).decode("ascii")
+        snapshot = None
+        if magic == RESUMED_MAGIC:
+            if len(view) < end + SNAPSHOT_SIZE.size:
+                raise ValueError("truncated move log")
+            start = end + SNAPSHOT_SIZE.size
+            end = start + SNAPSHOT_SIZE.unpack_from(view, end)[0]
+            snapshot = view[start:end]
+        if len(view) < end or (len(view) - end) % MOVE.size:
+            raise ValueError("truncated move log")
+        return cls(boardId, view[end:], snapshot)
+
+    def save(self, path):
+        """Writes the log to a file."""
+        with open(path, "wb") as file:
+            file.write(self.toBytes())
+
+    @classmethod
+    def load(cls, path):
+        """Reads a log from a file."""
+        with open(path, "rb") as file:
+            return cls.fromBytes(file.read())
+
+
+def applyMove(engine, row, col, button):
+    """
+    Plays a move of a log on an engine.
+
+    Parameters
+    ----------
+        engine : Engine
+        row : int
+        col : int
+        button : int
+            LEFT reveals, RIGHT flips the flag and MIDDLE chords
+    """
+    if button == RIGHT:
+        engine.flag(row, col)
+    elif button == MIDDLE:
+        engine.chord(row, col)
+    else:
+        engine.reveal(row, col)
+
+
+class Replayer:
+    """
+    A class used to play a move log again, headlessly, and to seek to any of its moves.
+
+    A snapshot of the board, in the packed format of savefile, is kept every interval moves, so seeking
+    to move n restores the closest snapshot before it and plays at most interval moves.
+
+    Attributes
+    ----------
+        log : MoveLog
+            the moves to play
+        engine : Engine
+            plays the moves on the board rebuilt from the id or the snapshot of the log
+        played : int
+            number of moves of the log played on the board
+        interval : int
+            number of moves between two snapshots
+        snapshots : dict
+            key : int
+                number of moves played
+            value : bytes
+                the board after those moves
+
+    Methods
+    -------
+        getBoard():
+            Returns the board the moves are played on.
+        step():
+            Plays the next move.
+        seek(n):
+            Sets the board to its state after the first n moves.
+        playToEnd():
+            Plays every move left.
+    """
+    def __init__(self, log, interval=64):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            log : MoveLog
+                the moves to play
+            interval : int
+                number of moves between two snapshots
+        """
+        self.log = log
+        self.engine = Engine(log.getStartBoard())
+        self.played = 0
+        self.interval = interval
+        self.snapshots = {0: dumpBoard(self.engine.board)}
+
+    def getBoard(self):
+        """Returns the board the moves are played on."""
+        return self.engine.board
+
+    def step(self):
+        """
+        Plays the next move, keeping a snapshot every interval moves.
+
+        Return
+        ------
+            False if every move has already been played
+        """
+        if self.played >= len(self.log):
+            return False
+        row, col, button, time = self.log.getMove(self.played)
+        applyMove(self.engine, row, col, button)
+        self.played += 1
+        if self.played % self.interval == 0 and self.played not in self.snapshots:
+            self.snapshots[self.played] = dumpBoard(self.engine.board)
+        return True
+
+    def seek(self, n):
+        """
+        Sets the board to its state after the first n moves of the log.
+
+        Parameters
+        ----------
+            n : int
+                number of moves, at most the length of the log
+        """
+        n = max(0, min(n, len(self.log)))
+        if not self.played <= n < self.played + self.interval:
+            start = max(played for played in self.snapshots if played <= n)
+            self.engine = Engine(loadBoard(self.snapshots[start])[0])
+            self.played = start
+        while self.played < n:
+            self.step()
+
+    def playToEnd(self):
+        """
+        Plays every move left, as fast as possible.
+
+        Return
+        ------
+            board : Board
+        """
+        while self.step():
+            pass
+        return self.engine.board
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays a move log headlessly and prints the result.")
+    parser.add_argument("log", help="move log written by the game")
+    parser.add_argument("--move", type=int, help="stop after this number of moves")
+    options = parser.parse_args()
+
+    replayer = Replayer(MoveLog.load(options.log))
+    if options.move is not None:
+        replayer.seek(options.move)
+    else:
+        replayer.playToEnd()
+    board = replayer.getBoard()
+    print(json.dumps({
+        "board": replayer.log.boardId,
+        "moves": replayer.played,
+        "revealed": board.clicked,
+        "won": board.getWon() and not board.getLost(),
+        "lost": board.getLost(),
+    }, indent=2))
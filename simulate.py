@@ -0,0 +1,218 @@
+import os
+import json
+import random
+import argparse
+from time import perf_counter
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from board import Board
+from piece import HIDDEN
+from solver import Solver
+from probability import Probabilities
+
+
+DIFFICULTIES = {
+    "beginner": ((9, 9), 10),
+    "intermediate": ((16, 16), 40),
+    "expert": ((16, 30), 99),
+}
+
+
+def playSolver(board, index, rng):
+    """
+    Plays the board with the solver and, when no block is certainly safe, reveals the block the least
+    likely to hold a mine.
+
+    Parameters
+    ----------
+        board : Board
+            the board to play, with every block hidden
+        index : (int, int)
+            coordinates of the first click
+        rng : random.Random
+            unused, the strategy is deterministic
+
+    Return
+    ------
+        guesses : int
+            number of blocks revealed without being certainly safe, the first click excluded
+    """
+    solver = Solver(board)
+    probabilities = Probabilities(board, solver)
+    position = board.toPosition(index)
+    guesses = 0
+    while not solver.play(position) and not board.getLost():
+        chances = probabilities.compute()
+        if not chances:
+            break
+        position = min(chances, key=chances.get)
+        guesses += 1
+    return guesses
+
+
+def playRandom(board, index, rng):
+    """
+    Plays the board by revealing hidden blocks at random.
+
+    Parameters
+    ----------
+        board : Board
+            the board to play, with every block hidden
+        index : (int, int)
+            coordinates of the first click
+        rng : random.Random
+            chooses the blocks
+
+    Return
+    ------
+        guesses : int
+            number of blocks revealed, the first click excluded
+    """
+    board.reveal(board.toPosition(index))
+    guesses = 0
+    state = board.state
+    while not board.getLost() and not board.getWon():
+        hidden = [position for position in range(len(state)) if state[position] == HIDDEN]
+        board.reveal(rng.choice(hidden))
+        guesses += 1
+    return guesses
+
+
+STRATEGIES = {
+    "solver": playSolver,
+    "random": playRandom,
+}
+
+
+def playGame(size, mines, strategy, seed):
+    """
+    Plays one seeded game, the first click being at the center of the board.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the board
+        mines : int
+            number of mines on the board
+        strategy : str
+            name of the strategy in STRATEGIES
+        seed : int
+            seed of the layout and of the strategy
+
+    Return
+    ------
+        result : dict
+            seed, won, guesses, revealed and seconds of the game
+    """
+    start = perf_counter()
+    board = Board(size, mines, True, seed=seed)
+    index = size[0] // 2, size[1] // 2
+    guesses = STRATEGIES[strategy](board, index, random.Random(seed))
+    return {
+        "seed": seed,
+        "won": board.getWon() and not board.getLost(),
+        "guesses": guesses,
+        "revealed": board.clicked,
+        "seconds": perf_counter() - start,
+    }
+
+
+def playShard(size, mines, strategy, seeds):
+    """
+    Plays one game per seed, in a worker process.
+
+    Return
+    ------
+        results : list[dict]
+    """
+    return [playGame(size, mines, strategy, seed) for seed in seeds]
+
+
+def simulate(size, mines, strategy, games, firstSeed=0, workers=None, shardSize=200, output=None):
+    """
+    Plays seeded games on a pool of processes and returns their aggregated statistics.
+
+    The seeds firstSeed, firstSeed + 1, ... are split into shards played by the workers, and the
+    results of every game are written to the output file as JSON lines as soon as their shard is done.
+
+    Parameters
+    ----------
+        size : (int, int)
+            width and height of the board
+        mines : int
+            number of mines on the board
+        strategy : str
+            name of the strategy in STRATEGIES
+        games : int
+            number of games to play
+        firstSeed : int
+            seed of the first game
+        workers : int
+            number of processes, the number of processors if None
+        shardSize : int
+            number of games played by a worker at a time
+        output : str
+            path of the JSON lines file of the games, None to not write them
+
+    Return
+    ------
+        stats : dict
+            games, wins, winRate, meanGuesses and gamesPerSecond of the simulation
+    """
+    start = perf_counter()
+    seeds = range(firstSeed, firstSeed + games)
+    shards = (seeds[i:i + shardSize] for i in range(0, games, shardSize))
+    wins = 0
+    guesses = 0
+    file = open(output, "w") if output is not None else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # only a few shards per worker are submitted at a time, and every finished shard is
+            # dropped once written, so the memory does not grow with the number of games
+            window = 2 * (workers or os.cpu_count() or 1)
+            pending = set()
+            for shard in islice(shards, window):
+                pending.add(executor.submit(playShard, size, mines, strategy, list(shard)))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        wins += result["won"]
+                        guesses += result["guesses"]
+                        if file is not None:
+                            file.write(json.dumps(result) + "\n")
+                for shard in islice(shards, len(done)):
+                    pending.add(executor.submit(playShard, size, mines, strategy, list(shard)))
+    finally:
+        if file is not None:
+            file.close()
+    seconds = perf_counter() - start
+    return {
+        "games": games,
+        "wins": wins,
+        "winRate": wins / games if games else 0.0,
+        "meanGuesses": guesses / games if games else 0.0,
+        "gamesPerSecond": games / seconds,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plays seeded games headlessly on a pool of processes.")
+    parser.add_argument("--difficulty", choices=DIFFICULTIES.keys(), default="beginner")
+    parser.add_argument("--size", type=int, nargs=2, metavar=("ROWS", "COLS"), help="custom size of the board")
+    parser.add_argument("--mines", type=int, help="custom number of mines")
+    parser.add_argument("--strategy", choices=STRATEGIES.keys(), default="solver")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="JSON lines file the result of every game is written to")
+    options = parser.parse_args()
+
+    size, mines = DIFFICULTIES[options.difficulty]
+    if options.size is not None:
+        size = tuple(options.size)
+        mines = options.mines if options.mines is not None else 0
+    elif options.mines is not None:
+        mines = options.mines
+    print(json.dumps(simulate(size, mines, options.strategy, options.games, options.seed,
+                              options.workers, output=options.output), indent=2))
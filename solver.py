@@ -0,0 +1,414 @@
+from piece import CLICKED, BORDER
+
+
+def enumerateComponent(cells, constraints, budget=200000):
+    """
+    Enumerates every assignment of mines to the cells of a component that satisfies its constraints.
+
+    Parameters
+    ----------
+        cells : list[int]
+            positions of the unknown blocks of the component
+        constraints : list[(tuple[int], int)]
+            the unknown blocks around a revealed number and the number of mines among them
+        budget : int
+            maximum number of partial assignments visited
+
+    Return
+    ------
+        result : dict
+            key : int
+                number of mines placed in the component
+            value : [int, list[int]]
+                the number of assignments with that many mines and, for every cell,
+                the number of those assignments in which the cell holds a mine
+        None if the budget has been exceeded
+    """
+    n = len(cells)
+    indices = {cell: i for i, cell in enumerate(cells)}
+    cellConstraints = [[] for _ in range(n)]
+    need = []
+    left = []
+    for c, (blocks, count) in enumerate(constraints):
+        need.append(count)
+        left.append(len(blocks))
+        for block in blocks:
+            cellConstraints[indices[block]].append(c)
+    assignment = [0] * n
+    result = {}
+    visited = 0
+
+    # depth-first search with an explicit stack, so the size of the component is not limited by the
+    # recursion limit: nextValue[i] is the value cell i tries next, applied[i] whether its current
+    # value is counted in the constraints
+    nextValue = [0] * n
+    applied = [False] * n
+    i = 0
+    mines = 0
+    while i >= 0:
+        if i == n:
+            entry = result.get(mines)
+            if entry is None:
+                entry = result[mines] = [0, [0] * n]
+            entry[0] += 1
+            counts = entry[1]
+            for j in range(n):
+                if assignment[j]:
+                    counts[j] += 1
+            i -= 1
+            continue
+        value = nextValue[i]
+        if applied[i]:
+            previous = value - 1
+            for c in cellConstraints[i]:
+                left[c] += 1
+                need[c] += previous
+            mines -= previous
+            assignment[i] = 0
+            applied[i] = False
+        if value == 2:
+            nextValue[i] = 0
+            i -= 1
+            continue
+        if value == 0:
+            visited += 1
+            if visited > budget:
+                return None
+        nextValue[i] = value + 1
+        valid = True
+        for c in cellConstraints[i]:
+            left[c] -= 1
+            need[c] -= value
+            if need[c] < 0 or need[c] > left[c]:
+                valid = False
+        if valid:
+            applied[i] = True
+            assignment[i] = value
+            mines += value
+            i += 1
+        else:
+            for c in cellConstraints[i]:
+                left[c] += 1
+                need[c] += value
+    return result
+
+
+class Solver:
+    """
+    A class used to find the moves that can be made on a board without guessing.
+
+    The solver only reads the revealed numbers of the board. It applies, in order, the rules of a single
+    number, the rules of a pair of numbers whose unknown blocks are a subset of one another and finally
+    the enumeration of every mine assignment of the frontier, checked against the number of mines left
+    on the board. The frontier is split into independent
+    components, and the result of every component is cached, so after a reveal only the components it
+    touched are enumerated again.
+
+    Attributes
+    ----------
+        board : Board
+            the board being solved
+        mines : set[int]
+            positions of the blocks deduced to be mines
+        frontier : set[int]
+            positions of the revealed numbers that still have unknown blocks around them
+        cache : dict
+            key : tuple
+                the constraints of a component
+            value : dict
+                the result of enumerateComponent for those constraints
+        budget : int
+            maximum number of partial assignments visited when enumerating a component
+        maxCache : int
+            number of component results kept before the cache is emptied
+
+    Methods
+    -------
+        isUnknown(position):
+            Checks if the block is neither revealed nor deduced to be a mine.
+        update(revealed):
+            Updates the frontier after the given blocks have been revealed.
+        markMine(position):
+            Records a block as deduced to be a mine.
+        getConstraints():
+            Returns the constraints of the frontier.
+        getComponents(constraints):
+            Splits the constraints into independent components.
+        solveComponent(constraints):
+            Returns the enumeration of a component, from the cache when possible.
+        findMoves():
+            Returns the blocks that are certainly safe and the ones that are certainly mines.
+        play(position):
+            Reveals the given block, then every block deduced to be safe, until no deduction is left.
+    """
+    def __init__(self, board, budget=200000, maxCache=4096):
+        """
+        Initialises the necessary attributes and reads the blocks already revealed on the board.
+
+        Parameters
+        ----------
+            board : Board
+                the board being solved
+            budget : int
+                maximum number of partial assignments visited when enumerating a component
+            maxCache : int
+                number of component results kept before the cache is emptied
+        """
+        self.board = board
+        self.mines = set()
+        self.frontier = set()
+        self.cache = {}
+        self.budget = budget
+        self.maxCache = maxCache
+        state = board.state
+        self.update([position for position in range(len(state)) if state[position] == CLICKED])
+
+    def isUnknown(self, position):
+        """Checks if the block is neither revealed nor deduced to be a mine."""
+        value = self.board.state[position]
+        return value != CLICKED and value != BORDER and position not in self.mines
+
+    def update(self, revealed):
+        """
+        Updates the frontier after the given blocks have been revealed.
+
+        Parameters
+        ----------
+            revealed : list[int]
+                positions of the newly revealed blocks
+        """
+        state = self.board.state
+        numbers = self.board.numbers
+        offsets = self.board.offsets
+        touched = set(revealed)
+        for position in revealed:
+            for offset in offsets:
+                touched.add(position + offset)
+        for position in touched:
+            if state[position] != CLICKED or numbers[position] == 0:
+                self.frontier.discard(position)
+                continue
+            if any(self.isUnknown(position + offset) for offset in offsets):
+                self.frontier.add(position)
+            else:
+                self.frontier.discard(position)
+
+    def markMine(self, position):
+        """
+        Records a block as deduced to be a mine and updates the frontier around it.
+
+        Parameters
+        ----------
+            position : int
+                position of the block in the flat buffers
+        """
+        self.mines.add(position)
+        self.update([position])
+
+    def getConstraints(self):
+        """
+        Returns the constraints of the frontier.
+
+        Return
+        ------
+            constraints : list[(tuple[int], int)]
+                for every number of the frontier, its unknown blocks and the number of mines among them
+        """
+        numbers = self.board.numbers
+        offsets = self.board.offsets
+        mines = self.mines
+        constraints = []
+        for position in self.frontier:
+            blocks = []
+            count = numbers[position]
+            for offset in offsets:
+                neighbour = position + offset
+                if neighbour in mines:
+                    count -= 1
+                elif self.isUnknown(neighbour):
+                    blocks.append(neighbour)
+            constraints.append((tuple(sorted(blocks)), count))
+        return constraints
+
+    def getComponents(self, constraints):
+        """
+        Splits the constraints into components that share no unknown block.
+
+        Parameters
+        ----------
+            constraints : list[(tuple[int], int)]
+
+        Return
+        ------
+            components : list[list[(tuple[int], int)]]
+        """
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for blocks, count in constraints:
+            for block in blocks:
+                parent.setdefault(block, block)
+            root = find(blocks[0])
+            for block in blocks[1:]:
+                other = find(block)
+                if other != root:
+                    parent[other] = root
+        components = {}
+        for constraint in constraints:
+            components.setdefault(find(constraint[0][0]), []).append(constraint)
+        return list(components.values())
+
+    def solveComponent(self, constraints):
+        """
+        Returns the enumeration of a component, from the cache when its constraints have not changed.
+
+        Parameters
+        ----------
+            constraints : list[(tuple[int], int)]
+
+        Return
+        ------
+            (cells, result) : (list[int], dict)
+                the unknown blocks of the component and the result of enumerateComponent,
+                None if the budget has been exceeded
+        """
+        key = tuple(sorted(set(constraints)))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        # order the cells by constraint, so every constraint is closed as early as possible
+        cells = []
+        seen = set()
+        for blocks, count in key:
+            for block in blocks:
+                if block not in seen:
+                    seen.add(block)
+                    cells.append(block)
+        solved = cells, enumerateComponent(cells, key, self.budget)
+        if len(self.cache) >= self.maxCache:
+            self.cache = {}
+        self.cache[key] = solved
+        return solved
+
+    def findMoves(self):
+        """
+        Returns the blocks that are certainly safe and the ones that are certainly mines.
+
+        Return
+        ------
+            (safe, mines) : (set[int], set[int])
+                positions of the blocks
+        """
+        safe = set()
+        mines = set()
+        constraints = [constraint for constraint in self.getConstraints() if constraint[0]]
+
+        # a single number
+        for blocks, count in constraints:
+            if count == 0:
+                safe.update(blocks)
+            elif count == len(blocks):
+                mines.update(blocks)
+        if safe or mines:
+            return safe, mines
+
+        # a pair of numbers, the unknown blocks of one being a subset of the other
+        byBlock = {}
+        for constraint in constraints:
+            for block in constraint[0]:
+                byBlock.setdefault(block, []).append(constraint)
+        for blocks, count in constraints:
+            smaller = set(blocks)
+            for other, otherCount in byBlock[blocks[0]]:
+                if len(other) <= len(blocks) or not smaller.issubset(other):
+                    continue
+                rest = [block for block in other if block not in smaller]
+                if otherCount == count:
+                    safe.update(rest)
+                elif otherCount - count == len(rest):
+                    mines.update(rest)
+        if safe or mines:
+            return safe, mines
+
+        # every assignment of every component, together with the number of mines left
+        solved = [self.solveComponent(component) for component in self.getComponents(constraints)]
+        left = self.board.getNoBombs() - len(self.mines)
+        size = self.board.getSize()
+        interior = size[0] * size[1] - self.board.clicked - len(self.mines)
+        feasible = []
+        for cells, result in solved:
+            interior -= len(cells)
+            # a component too large to enumerate may hold any number of mines
+            feasible.append(set(result) if result else set(range(len(cells) + 1)))
+
+        def fits(total):
+            return 0 <= left - total <= interior
+
+        prefix = [{0}]
+        for counts in feasible:
+            prefix.append({a + b for a in prefix[-1] for b in counts if a + b <= left})
+        suffix = [{0}]
+        for counts in reversed(feasible):
+            suffix.append({a + b for a in suffix[-1] for b in counts if a + b <= left})
+        suffix.reverse()
+
+        for c, (cells, result) in enumerate(solved):
+            if not result:
+                continue
+            others = {a + b for a in prefix[c] for b in suffix[c + 1]}
+            allowed = [k for k in result if any(fits(k + total) for total in others)]
+            ways = sum(result[k][0] for k in allowed)
+            for i, cell in enumerate(cells):
+                count = sum(result[k][1][i] for k in allowed)
+                if count == 0:
+                    safe.add(cell)
+                elif count == ways:
+                    mines.add(cell)
+
+        totals = [total for total in prefix[-1] if fits(total)]
+        if interior > 0 and totals:
+            inFrontier = set()
+            for cells, result in solved:
+                inFrontier.update(cells)
+            if all(left == total for total in totals):
+                safe.update(position for position in range(len(self.board.state))
+                            if self.isUnknown(position) and position not in inFrontier)
+            elif all(left - total == interior for total in totals):
+                mines.update(position for position in range(len(self.board.state))
+                             if self.isUnknown(position) and position not in inFrontier)
+        return safe, mines
+
+    def play(self, position):
+        """
+        Reveals the given block, then every block deduced to be safe, until no deduction is left.
+
+        Parameters
+        ----------
+            position : int
+                position of the first block to reveal
+
+        Return
+        ------
+            True if the board has been won without guessing
+        """
+        board = self.board
+        self.update(board.reveal(position))
+        while not board.getLost() and not board.getWon():
+            safe, mines = self.findMoves()
+            if not safe and not mines:
+                return False
+            for mine in mines:
+                self.markMine(mine)
+            revealed = []
+            for block in safe:
+                revealed.extend(board.reveal(block))
+            if not revealed and not mines:
+                # the safe blocks are flagged, the solver does not remove flags
+                return False
+            self.update(revealed)
+        return board.getWon() and not board.getLost()
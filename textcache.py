@@ -0,0 +1,109 @@
+import pygame
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    A class used to load every font size once and to keep the rendered text surfaces.
+
+    Attributes
+    ----------
+        font : str
+            the location of the font used to write text
+        maxSize : int
+            the number of rendered surfaces kept before the least recently used is dropped
+        fonts : dict
+            key : int
+                size of the font
+            value : pygame.font.Font
+            Contains the loaded fonts
+        surfaces : OrderedDict
+            key : (str, int, (int, int, int))
+                text, font size and color
+            value : pygame.Surface
+            Contains the rendered texts, the most recently used last
+        hits : int
+            number of renders served from the cache
+        misses : int
+            number of renders that had to be done by the font
+
+    Methods
+    -------
+        getFont(size):
+            Returns the font of the given size, loading it the first time.
+        render(text, size, color):
+            Returns the surface of the text rendered with the given size and color.
+        clear():
+            Forgets the loaded fonts and the rendered surfaces.
+    """
+    def __init__(self, font, maxSize=256):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            font : str
+                the location of the font used to write text
+            maxSize : int
+                the number of rendered surfaces kept
+        """
+        self.font = font
+        self.maxSize = maxSize
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def getFont(self, size):
+        """
+        Returns the font of the given size, loading it the first time.
+
+        Parameters
+        ----------
+            size : int
+                size of the font
+
+        Return
+        ------
+            font : pygame.font.Font
+        """
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(self.font, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """
+        Returns the surface of the text rendered with the given size and color.
+
+        Parameters
+        ----------
+            text : str
+                the text to render
+            size : int
+                size of the font
+            color : (int, int, int)
+                RGB color of the text
+
+        Return
+        ------
+            surface : pygame.Surface
+        """
+        key = (text, size, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.getFont(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxSize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Forgets the loaded fonts and the rendered surfaces, needed once pygame has been quit."""
+        self.fonts = {}
+        self.surfaces = OrderedDict()
@@ -0,0 +1,117 @@
+from math import ceil
+from time import monotonic
+
+
+class Timer:
+    """
+    A class used to count down a number of seconds with the monotonic clock, inside the game loop.
+
+    The remaining time is computed from the clock when asked, so the timer does not drift with the
+    duration of the frames and needs no process or thread of its own.
+
+    Attributes
+    ----------
+        seconds : int
+            the number of seconds the timer counts down
+        clock : callable
+            returns the current time in seconds
+        elapsed : float
+            the seconds counted before the last start or resume
+        startedAt : float
+            the time of the last start or resume, None while the timer is stopped
+
+    Methods
+    -------
+        start():
+            Starts the timer, or resumes it if it was paused.
+        pause():
+            Stops the timer, keeping the elapsed time.
+        resume():
+            Restarts the timer after a pause.
+        reset(seconds, elapsed):
+            Stops the timer and sets the elapsed time back to zero, or to the given seconds.
+        isRunning():
+            Returns whether the timer is counting.
+        getElapsed():
+            Returns the elapsed seconds.
+        getRemaining():
+            Returns the remaining seconds.
+        getSeconds():
+            Returns the remaining whole seconds, as shown in the header.
+        isFinished():
+            Checks if the given seconds have been elapsed.
+    """
+    def __init__(self, seconds, clock=monotonic):
+        """
+        Initialises the necessary attributes.
+
+        Parameters
+        ----------
+            seconds : int
+                the number of seconds the timer counts down
+            clock : callable
+                returns the current time in seconds
+        """
+        self.seconds = seconds
+        self.clock = clock
+        self.elapsed = 0.0
+        self.startedAt = None
+
+    def start(self):
+        """Starts the timer, or resumes it if it was paused."""
+        if self.startedAt is None:
+            self.startedAt = self.clock()
+
+    def pause(self):
+        """Stops the timer, keeping the elapsed time."""
+        if self.startedAt is not None:
+            self.elapsed += self.clock() - self.startedAt
+            self.startedAt = None
+
+    def resume(self):
+        """Restarts the timer after a pause."""
+        self.start()
+
+    def reset(self, seconds=None, elapsed=0.0):
+        """
+        Stops the timer and sets the elapsed time back to zero, or to the given seconds.
+
+        Parameters
+        ----------
+            seconds : int
+                the new number of seconds to count down, unchanged if None
+            elapsed : float
+                the seconds already counted, for a resumed game
+        """
+        if seconds is not None:
+            self.seconds = seconds
+        self.elapsed = elapsed
+        self.startedAt = None
+
+    def isRunning(self):
+        """Returns whether the timer is counting."""
+        return self.startedAt is not None
+
+    def getElapsed(self):
+        """Returns the elapsed seconds."""
+        if self.startedAt is None:
+            return self.elapsed
+        return self.elapsed + self.clock() - self.startedAt
+
+    def getRemaining(self):
+        """Returns the remaining seconds, never below zero."""
+        return max(0.0, self.seconds - self.getElapsed())
+
+    def getSeconds(self):
+        """Returns the remaining whole seconds, as shown in the header."""
+        return ceil(self.getRemaining())
+
+    def isFinished(self):
+        """
+        Checks if the given seconds have been elapsed.
+
+        Return
+        ------
+            remaining <= 0
+        """
+        return self.getRemaining() <= 0